@@ -1,9 +1,13 @@
 import streamlit as st
 import boto3
+import threading
 import json
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from aws_services import AWSResourceCollector
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from aws_services import AWSResourceCollector, METRIC_CONFIGS
 from bedrock_utils import BedrockService
 import plotly.express as px
 
@@ -23,40 +27,129 @@ def debug_print(message):
     if DEBUG:
         print(f"DEBUG: {message}")
 
+# 공유 리소스 초기화
+## boto3 client 생성 비용(자격 증명 확인, 커넥션 풀 생성)을 한 번만 지불하도록 cache_resource로 재사용
+## AWSResourceCollector와 BedrockService는 rerun 간에도 동일 인스턴스를 사용
+## 서비스/리전별 client는 AWSResourceCollector가 하나의 Session에서 lock으로 보호하여 한 번만 생성 (수집 워커 스레드에서도 Streamlit 컨텍스트 불필요)
+
+@st.cache_resource
+def get_collector():
+    return AWSResourceCollector()
+
+@st.cache_resource
+def get_bedrock():
+    return BedrockService()
+
 # Bedrock 서비스 초기화
-bedrock_service = BedrockService()
+bedrock_service = get_bedrock()
 
 # 캐시 데코레이터
 ## 성능 최적화를 위한 캐시 함수 정의
 ## AWS 리소스, 비용 분석, 예측, 추천 데이터를 캐시 (5분) --> customizing 필요시 바꿔주세요!
+## 탭마다 별도로 캐시하여 Load 버튼을 누른 탭의 데이터만 조회 (다른 탭의 AWS API 호출 비용을 지불하지 않음)
+## 한 탭에서 함께 쓰는 독립적인 조회(비용 분석과 예측)는 ThreadPoolExecutor로 동시에 수행
+## cache_data는 호출마다 결과 전체를 역직렬화하므로 cache_resource로 같은 객체를 공유 (읽기 전용으로만 사용)
+## 앱 재시작 후에도 Cost Explorer를 다시 호출하지 않도록 비용 응답은 AWSResourceCollector의 디스크 캐시(~/.cache/aws_llm_dashboard)에서 재사용
 
-@st.cache_data(ttl=300)
+@st.cache_resource(ttl=300, show_spinner=False)
 def fetch_aws_resources():
     debug_print("Fetching AWS resources...")
-    collector = AWSResourceCollector()
-    resources = collector.collect_all_resources()
-    return resources
-
-@st.cache_data(ttl=300)
-def fetch_cost_analysis():
-    debug_print("Fetching cost analysis...")
-    collector = AWSResourceCollector()
-    analysis = collector.get_cost_analysis()
-    return analysis
-
-@st.cache_data(ttl=300)
-def fetch_cost_predictions():
-    debug_print("Fetching cost predictions...")
-    collector = AWSResourceCollector()
-    predictions = collector.predict_costs()
-    return predictions
-
-@st.cache_data(ttl=300)
+    resources_df = prepare_resources(get_collector().collect_all_resources())
+    # 하위 캐시 함수의 키로 사용할 수집 시각
+    resources_df.attrs['fetched_at'] = datetime.now().isoformat()
+    return resources_df
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def fetch_cost_data():
+    debug_print("Fetching cost analysis and predictions...")
+    collector = get_collector()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        cost_analysis = executor.submit(collector.get_cost_analysis)
+        predictions = executor.submit(collector.predict_costs)
+        return {
+            'cost_analysis': cost_analysis.result(),
+            'predictions': predictions.result(),
+            'fetched_at': datetime.now().isoformat()
+        }
+
+@st.cache_resource(ttl=300, show_spinner=False)
 def fetch_recommendations():
     debug_print("Fetching recommendations...")
-    collector = AWSResourceCollector()
-    recommendations = collector.get_optimization_recommendations()
-    return recommendations
+    return {
+        'recommendations': get_collector().get_optimization_recommendations(),
+        # 하위 캐시 함수의 키로 사용할 수집 시각 (DataFrame 내용을 매번 해싱하지 않도록 함)
+        'fetched_at': datetime.now().isoformat()
+    }
+
+# 리소스 DataFrame 후처리
+## 필터링에 쓰이는 컬럼을 로드 시점에 한 번만 category 타입으로 변환 (문자열 비교 대신 정수 코드 비교)
+## 상태 필터용 소문자 컬럼(status_lower)도 미리 계산해 쿼리마다 .str.lower()를 반복하지 않도록 함
+## 태그 JSON은 dict 컬럼(tags_dict)과 표시명 컬럼(tags_name)으로 한 번만 파싱
+## 메트릭 값은 수집 단계에서 메트릭명 컬럼(float)으로 펼쳐지므로, 서비스별로 없는 메트릭 컬럼만 NaN으로 보충
+
+METRIC_NAMES = list(dict.fromkeys(
+    metric_name for config in METRIC_CONFIGS.values() for metric_name, _ in config['metrics']
+))
+DERIVED_COLUMNS = ['status_lower', 'tags_dict', 'tags_name']
+BASE_COLUMNS = ['resource_id', 'service_type', 'region', 'status', 'creation_date', 'last_modified', 'tags', 'cost']
+
+def prepare_resources(resources_df):
+    if resources_df.empty:
+        return resources_df
+    resources_df['service_type'] = resources_df['service_type'].astype('category')
+    resources_df['region'] = resources_df['region'].astype('category')
+    resources_df['status_lower'] = resources_df['status'].str.lower().astype('category')
+    resources_df['tags_dict'] = resources_df['tags'].map(_parse_tags)
+    resources_df['tags_name'] = resources_df['tags_dict'].map(_tag_name)
+    for metric_name in METRIC_NAMES:
+        if metric_name not in resources_df.columns:
+            resources_df[metric_name] = np.nan
+    return resources_df
+
+# 태그 파싱 및 표시용 이름 추출 (Name 태그 우선, 없으면 첫 번째 태그 값)
+## 렌더링 시마다 json.loads를 반복하지 않도록 로드 시점에 한 번만 호출됨
+
+def _parse_tags(tags):
+    if isinstance(tags, str):
+        try:
+            tags = json.loads(tags)
+        except ValueError:
+            return {}
+    return tags if isinstance(tags, dict) else {}
+
+def _tag_name(tags):
+    return tags.get("Name") or next(iter(tags.values()), "No Tags")
+
+# 샘플 쿼리 매핑
+## 사이드바 샘플 쿼리는 필터 파라미터가 고정되어 있으므로 Bedrock 호출 없이 바로 사용
+
+SAMPLE_MAP = {
+    "us-east-1 리전의 모든 EC2 인스턴스 보기": {"service_type": "EC2", "region": "us-east-1", "status": None},
+    "us-east-1 리전의 RDS 리소스 목록": {"service_type": "RDS", "region": "us-east-1", "status": None},
+    "Lambda 함수 목록 보기": {"service_type": "Lambda", "region": None, "status": None},
+    "모든 S3 버킷 조회": {"service_type": "S3", "region": None, "status": None},
+    "실행 중인 EC2 인스턴스 보기": {"service_type": "EC2", "region": None, "status": "running"}
+}
+
+# 자연어 쿼리 파싱 결과 캐시 (1시간)
+## 샘플 쿼리처럼 동일한 문자열이 반복되는 경우 Bedrock 호출 없이 바로 결과 반환
+## Bedrock 오류/스로틀링/응답 파싱 실패(None)면 예외를 발생시켜 캐시하지 않음 (Streamlit은 예외를 캐시하지 않음)
+## 모든 값이 null인 결과("모든 리소스 보기" 등)는 정상 결과이므로 캐시
+
+@st.cache_data(ttl=3600)
+def parse_query(query):
+    query_params = bedrock_service.process_natural_language_query(query)
+    if query_params is None:
+        raise ValueError(f"Could not parse query: {query}")
+    return query_params
+
+# 추천사항별 AI 최적화 전략 캐시 (5분)
+## 추천 목록 전체를 한 번에 Bedrock으로 보내고 결과를 재사용
+## 캐시 키는 추천 목록 수집 시각만 사용 (_recommendations는 밑줄 접두사로 해싱 제외)
+
+@st.cache_data(ttl=300)
+def fetch_recommendation_strategies(fetched_at, _recommendations):
+    return bedrock_service.enhance_recommendations_batch(_recommendations)
 
 
 # DatabaseConnection 클래스
@@ -66,35 +159,131 @@ def fetch_recommendations():
 class DatabaseConnection:
     def __init__(self):
         debug_print("Initializing DatabaseConnection")
-        self.resources_df = fetch_aws_resources()
         
     def execute_query(self, query):
         debug_print(f"Executing query: {query}")
+        # cache_resource로 공유되는 DataFrame을 복사 없이 읽기 전용으로 사용 (수정하지 않음)
+        # 필터는 하나의 boolean mask로 누적 후 마지막에 한 번만 적용 (mask 인덱싱 결과는 새 DataFrame)
+        resources_df = fetch_aws_resources()
         try:
-            filtered_df = self.resources_df.copy()
-            
             # Bedrock을 통한 쿼리 파라미터 추출
-            query_params = bedrock_service.process_natural_language_query(query)
+            query_params = SAMPLE_MAP.get(query.strip())
+            if query_params is None:
+                try:
+                    query_params = parse_query(query)
+                except ValueError as e:
+                    # 파싱 실패 시 필터 없이 전체 리소스 표시 (다음 실행에서 다시 파싱 시도)
+                    debug_print(str(e))
+                    query_params = None
             debug_print(f"Query parameters: {query_params}")
             
+            mask = np.ones(len(resources_df), dtype=bool)
             if query_params:
                 # 서비스 타입 필터링
                 if query_params.get('service_type'):
-                    filtered_df = filtered_df[filtered_df['service_type'] == query_params['service_type']]
+                    mask &= (resources_df['service_type'] == query_params['service_type']).to_numpy()
                 
                 # 리전 필터링
                 if query_params.get('region'):
-                    filtered_df = filtered_df[filtered_df['region'] == query_params['region']]
+                    mask &= (resources_df['region'] == query_params['region']).to_numpy()
                 
                 # 상태 필터링
                 if query_params.get('status'):
-                    filtered_df = filtered_df[filtered_df['status'].str.lower() == query_params['status'].lower()]
+                    mask &= (resources_df['status_lower'] == query_params['status'].lower()).to_numpy()
             
-            return filtered_df
+            return resources_df[mask]
             
         except Exception as e:
             debug_print(f"Error executing query: {str(e)}")
-            return self.resources_df  # 오류 발생 시 전체 데이터 반환
+            return resources_df  # 오류 발생 시 전체 데이터 반환
+
+@st.cache_resource
+def get_database():
+    return DatabaseConnection()
+
+# AWS Expert Chat 컨텍스트 요약
+## 전체 리소스/비용 데이터를 그대로 보내지 않고 비용 상위 항목과 최근 일별 비용만 전달
+## 개수 제한은 필요시 조정해주세요!
+
+CHAT_TOP_RESOURCES = 20
+CHAT_TOP_COSTS = 10
+CHAT_DAILY_DAYS = 30
+
+def build_chat_context(resources_df, cost_analysis):
+    resources = []
+    if not resources_df.empty:
+        top_resources = resources_df.drop(columns=DERIVED_COLUMNS, errors='ignore')
+        if 'cost' in top_resources.columns:
+            top_resources = top_resources.nlargest(CHAT_TOP_RESOURCES, 'cost')
+        else:
+            top_resources = top_resources.head(CHAT_TOP_RESOURCES)
+        # 서비스별 컬럼이 펼쳐져 있으므로 리소스마다 값이 있는 컬럼만 남김
+        resources = [
+            {key: value for key, value in record.items() if pd.notna(value)}
+            for record in top_resources.to_dict(orient='records')
+        ]
+    
+    cost_data = {}
+    if isinstance(cost_analysis, dict) and cost_analysis:
+        for key in ['service_costs', 'region_costs']:
+            if key in cost_analysis and not cost_analysis[key].empty:
+                top_costs = cost_analysis[key].nlargest(CHAT_TOP_COSTS, 'cost')
+                cost_data[key] = top_costs.to_dict(orient='records')
+        if 'daily_costs' in cost_analysis and not cost_analysis['daily_costs'].empty:
+            daily_costs = cost_analysis['daily_costs']
+            dates = pd.to_datetime(daily_costs['date'])
+            recent = daily_costs[dates > dates.max() - pd.Timedelta(days=CHAT_DAILY_DAYS)]
+            cost_data['daily_costs'] = recent.to_dict(orient='records')
+    
+    return {
+        'resources': resources,
+        'cost_data': cost_data
+    }
+
+# 캐시 함수 병렬 호출
+## 캐시 함수는 Streamlit 스크립트 실행 컨텍스트가 필요하므로 워커 스레드에 현재 컨텍스트를 연결한 뒤 호출
+## 반환값: 입력 순서와 동일한 결과 리스트
+
+def fetch_in_parallel(*fetchers):
+    ctx = get_script_run_ctx()
+    def run(fetch):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch()
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+        return list(executor.map(run, fetchers))
+
+# 컨텍스트 dict 캐시
+## Ask Expert 클릭마다 DataFrame -> dict 변환을 반복하지 않도록 변환 결과를 재사용
+## 캐시 키는 리소스/비용 데이터의 수집 시각만 사용하여 화면에 표시 중인 데이터와 항상 같은 컨텍스트를 사용
+## (_resources_df, _cost_analysis는 밑줄 접두사로 해싱 제외)
+
+@st.cache_data(ttl=300)
+def fetch_chat_context(resources_fetched_at, cost_fetched_at, _resources_df, _cost_analysis):
+    return build_chat_context(_resources_df, _cost_analysis)
+
+# 탭 지연 로딩
+## Streamlit은 rerun마다 스크립트 전체를 실행하므로, 사용자가 Load 버튼을 누른 탭만 데이터를 조회
+## 한 번 열린 탭은 session_state에 기록되어 이후 rerun에서는 바로 렌더링
+
+def tab_opened(tab_number, label):
+    state_key = f'tab{tab_number}_opened'
+    if st.session_state.get(state_key):
+        return True
+    st.button(label, key=f'tab{tab_number}_load', on_click=lambda: st.session_state.update({state_key: True}))
+    return False
+
+# 수집 오류 표시
+## 수집 중 Cost Explorer/CloudWatch 호출이 스로틀링되거나 권한이 없던 횟수를 표시 (해당 비용/메트릭은 비어 있음)
+
+def show_collection_warnings(resources_df):
+    show_api_error_warning(resources_df.attrs.get('throttled', 0), resources_df.attrs.get('denied', 0))
+
+def show_api_error_warning(throttled, denied):
+    if throttled or denied:
+        st.warning(
+            f"일부 AWS API 호출이 실패하여 비용/메트릭 값이 비어 있을 수 있습니다 "
+            f"(스로틀링 {throttled}회, 권한 없음 {denied}회)"
+        )
 
 # 제목
 st.title("☁️ AWS Resource Monitor")
@@ -114,14 +303,7 @@ with tab1:
     # Sidebar 영역
     with st.sidebar:
         st.header("Sample Queries")
-        sample_queries = [
-            "us-east-1 리전의 모든 EC2 인스턴스 보기",
-            "us-east-1 리전의 RDS 리소스 목록",
-            "Lambda 함수 목록 보기",
-            "모든 S3 버킷 조회",
-            "실행 중인 EC2 인스턴스 보기"
-        ]
-        for query in sample_queries:
+        for query in SAMPLE_MAP:
             if st.button(query):
                 st.session_state['user_input'] = query
 
@@ -143,8 +325,11 @@ with tab1:
     # [변경됨] "Query Resources" 버튼 클릭 시 무거운 쿼리를 한 번 실행하고 결과를 캐싱함.
     if st.button("Query Resources", type="primary"):
         if user_input:
-            db = DatabaseConnection()                     # [변경됨]
+            db = get_database()                           # [변경됨]
             results = db.execute_query(user_input)        # [변경됨]
+            if 'resource_id' in results.columns:
+                # 상세 정보 조회를 위해 resource_id 인덱스를 한 번만 생성
+                results = results.set_index('resource_id', drop=False)
             st.session_state['results'] = results         # [변경됨: 결과 캐싱]
         else:
             st.warning("Please enter a query first.")
@@ -155,6 +340,7 @@ with tab1:
         
         if not results.empty:
             st.subheader("Query Results:")
+            show_collection_warnings(fetch_aws_resources())
             
             # 서비스 필터 적용
             if service_filter:
@@ -178,7 +364,9 @@ with tab1:
             details_placeholder = st.empty()
             
             # 선택한 resource_id에 해당하는 데이터 가져오기
-            resource_data = results[results['resource_id'] == selected_resource].iloc[0]
+            resource_data = results.loc[selected_resource]
+            if isinstance(resource_data, pd.DataFrame):  # 중복된 resource_id가 있는 경우 첫 번째 항목 사용
+                resource_data = resource_data.iloc[0]
             
             with details_placeholder.container():
                 col1, col2, col3 = st.columns(3)
@@ -188,20 +376,19 @@ with tab1:
                     st.metric("Status", resource_data['status'])
                 with col3:
                     if 'cost' in resource_data:
-                        st.metric("Cost (30 days)", f"${resource_data['cost']:.2f}")
+                        cost = resource_data['cost']
+                        cost_days = get_collector().cost_window_days(resource_data['service_type'])
+                        st.metric(f"Cost ({cost_days} days)", "N/A" if pd.isna(cost) else f"${cost:.2f}")
                 
-                # 상세 정보 표시
-                if isinstance(resource_data.get('details'), dict):
-                    st.json(resource_data['details'])
+                # 상세 정보 표시 (공통/파생 컬럼을 제외하고 값이 있는 서비스별 컬럼만)
+                details = resource_data.drop(labels=BASE_COLUMNS + DERIVED_COLUMNS, errors='ignore').dropna()
+                if not details.empty:
+                    st.json(details.to_json())
                 
                 # 태그 정보 표시
-                if resource_data.get('tags'):
+                if resource_data.get('tags_dict'):
                     st.subheader("Tags")
-                    try:
-                        tags = json.loads(resource_data['tags'])
-                        st.json(tags)
-                    except Exception as e:
-                        st.json(resource_data['tags'])
+                    st.json(resource_data['tags_dict'])
             
             st.success("Query executed successfully!")
         else:
@@ -218,81 +405,92 @@ with tab2:
     debug_print("Rendering Cost Analysis tab")
     st.header("Cost Analysis Dashboard")
     
-    predictions = fetch_cost_predictions()
-    if isinstance(predictions, dict) and predictions:
-        st.subheader("💰 Cost Predictions")
-        cols = st.columns(len(predictions))
-        for idx, (service, pred_data) in enumerate(predictions.items()):
-            with cols[idx]:
-                st.metric(
-                    label=f"{service} Cost Trend",
-                    value=f"${pred_data['current_daily_avg']:.2f}/day",
-                    delta=f"${pred_data['predicted_daily_avg'] - pred_data['current_daily_avg']:.2f}"
-                )
-                st.caption(f"Trend: {pred_data['trend']}")
+    if tab_opened(2, "Load Cost Analysis"):
+        # 비용 분석과 예측은 fetch_cost_data에서 동시에 조회
+        cost_bundle = fetch_cost_data()
+        predictions = cost_bundle['predictions']
+        if isinstance(predictions, dict) and predictions:
+            st.subheader("💰 Cost Predictions")
+            cols = st.columns(len(predictions))
+            for idx, (service, pred_data) in enumerate(predictions.items()):
+                with cols[idx]:
+                    st.metric(
+                        label=f"{service} Cost Trend",
+                        value=f"${pred_data['current_daily_avg']:.2f}/day",
+                        delta=f"${pred_data['predicted_daily_avg'] - pred_data['current_daily_avg']:.2f}"
+                    )
+                    st.caption(f"Trend: {pred_data['trend']}")
     
-    cost_data = fetch_cost_analysis()
-    if isinstance(cost_data, dict) and cost_data:
-        st.subheader("📊 Cost Analysis")
-        total_cost = cost_data['service_costs']['cost'].sum()
-        st.metric("Total Cost", f"${total_cost:,.2f}")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**Service Costs**")
-            st.dataframe(
-                cost_data['service_costs'].style.format({'cost': '${:,.2f}'}),
-                use_container_width=True,
-                hide_index=True
-            )
-        with col2:
-            st.markdown("**Region Costs**")
-            st.dataframe(
-                cost_data['region_costs'].style.format({'cost': '${:,.2f}'}),
-                use_container_width=True,
-                hide_index=True
-            )
+        cost_data = cost_bundle['cost_analysis']
+        if isinstance(cost_data, dict) and cost_data:
+            st.subheader("📊 Cost Analysis")
+            total_cost = cost_data['service_costs']['cost'].sum()
+            st.metric("Total Cost", f"${total_cost:,.2f}")
         
-        st.subheader("🤖 AI Cost Insights")
-        insights = bedrock_service.generate_cost_insights(cost_data)
-        if insights:
-            st.markdown(insights)
-        else:
-            st.info("현재 비용 분석 데이터를 생성할 수 없습니다.")
-
-        st.subheader("📈 Cost Visualizations")
+            # 금액은 숫자 컬럼 그대로 두고 표시 형식만 지정 (Styler 렌더링 없이, 헤더 클릭 시 숫자 기준 정렬)
+            cost_column_config = {'cost': st.column_config.NumberColumn(format="$%.2f")}
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Service Costs**")
+                st.dataframe(
+                    cost_data['service_costs'][['SERVICE', 'cost']],
+                    column_config=cost_column_config,
+                    use_container_width=True,
+                    hide_index=True
+                )
+            with col2:
+                st.markdown("**Region Costs**")
+                st.dataframe(
+                    cost_data['region_costs'][['REGION', 'cost']],
+                    column_config=cost_column_config,
+                    use_container_width=True,
+                    hide_index=True
+                )
         
-        fig_pie = px.pie(
-            cost_data['service_costs'],
-            values='cost',
-            names='SERVICE',
-            title='Cost Distribution by Service'
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+            st.subheader("🤖 AI Cost Insights")
+            insights = bedrock_service.generate_cost_insights(cost_data)
+            if insights:
+                st.markdown(insights)
+            else:
+                st.info("현재 비용 분석 데이터를 생성할 수 없습니다.")
+
+            st.subheader("📈 Cost Visualizations")
         
-        fig_bar = px.bar(
-            cost_data['region_costs'],
-            x='REGION',
-            y='cost',
-            title='Cost by Region'
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+            fig_pie = px.pie(
+                cost_data['service_costs'],
+                values='cost',
+                names='SERVICE',
+                title='Cost Distribution by Service'
+            )
+            st.plotly_chart(fig_pie, use_container_width=True)
         
-        if 'daily_costs' in cost_data:
-            fig_line = px.line(
-                cost_data['daily_costs'],
-                x='date',
+            fig_bar = px.bar(
+                cost_data['region_costs'],
+                x='REGION',
                 y='cost',
-                color='SERVICE',
-                title='Daily Cost Trend'
+                title='Cost by Region'
             )
-            st.plotly_chart(fig_line, use_container_width=True)
-    else:
-        st.info("No cost analysis data available")
+            st.plotly_chart(fig_bar, use_container_width=True)
+        
+            if 'daily_costs' in cost_data:
+                fig_line = px.line(
+                    cost_data['daily_costs'],
+                    x='date',
+                    y='cost',
+                    color='SERVICE',
+                    title='Daily Cost Trend'
+                )
+                st.plotly_chart(fig_line, use_container_width=True)
+        else:
+            st.info("No cost analysis data available")
+            show_api_error_warning(*get_collector().error_counts())
 
 # 탭 3: Resource Metrics
 ## 서비스별 리소스 메트릭 표시
 ## 확장 가능한 메트릭 뷰 구성
+## 리소스 수가 많은 경우를 위해 페이지당 METRICS_PAGE_SIZE개씩 표시
+
+METRICS_PAGE_SIZE = 20
 
 with tab3:
     debug_print("Rendering Resource Metrics tab")
@@ -303,52 +501,58 @@ with tab3:
         ["EC2", "RDS", "Lambda"]
     )
     
-    resources_df = fetch_aws_resources()
-    if not resources_df.empty:
-        service_resources = resources_df[resources_df['service_type'] == selected_service]
+    if tab_opened(3, "Load Resource Metrics"):
+        resources_df = fetch_aws_resources()
+        show_collection_warnings(resources_df)
+        if not resources_df.empty:
+            service_resources = resources_df[resources_df['service_type'] == selected_service]
+            # 상태 색상은 루프 밖에서 컬럼 단위로 한 번에 계산
+            service_resources = service_resources.assign(
+                status_color=np.where(service_resources['status_lower'] == 'running', 'green', 'grey')
+            )
         
-        for _, resource in service_resources.iterrows():
-            print("resource :"  , resource)
-            # Prepare tags output            
-            tags = resource.get('tags', 'No Tags')
-            try:
-                if isinstance(tags, dict):                    
-                    tags_output = tags.get("Name") or next(iter(tags.values()), "No Tags")
-                else:
-                    # If tags is not a dict, try parsing it as JSON                    
-                    tags_dict = json.loads(tags)
-                    tags_output = tags_dict.get("Name") or next(iter(tags_dict.values()), "No Tags")
-            except Exception as e:
-                tags_output = "No Tags"
-
-           # 상태 색상 지정
-            status_color = "green" if resource['status'].lower() == "running" else "grey"
-
-            # HTML로 제목 구성
-            title_html = f"""
-            <div style="border: 1px solid #ddd; padding: 10px; border-radius: 5px;">
-                <b>Resource ID:</b> {resource['resource_id']} | <b>Tag:</b> {tags_output} |
-                <b>Status:</b> <span style="color: {status_color};">{resource['status']}</span>
-            </div>
-            """
-
-            # HTML 제목 표시 (expander 없이)
+            # 페이지 단위로 렌더링 (Streamlit 컴포넌트 수를 페이지 크기로 제한)
+            total_pages = max(1, -(-len(service_resources) // METRICS_PAGE_SIZE))
+            page = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=total_pages,
+                value=1,
+                key=f"metrics_page_{selected_service}"
+            )
+            page_resources = service_resources.iloc[(page - 1) * METRICS_PAGE_SIZE:page * METRICS_PAGE_SIZE]
+        
+            # HTML로 리소스 목록 구성 후 한 번의 st.markdown으로 표시
+            title_html = "".join(
+                f"""
+                <div style="border: 1px solid #ddd; padding: 10px; border-radius: 5px; margin-bottom: 5px;">
+                    <b>Resource ID:</b> {resource.resource_id} | <b>Tag:</b> {resource.tags_name} |
+                    <b>Status:</b> <span style="color: {resource.status_color};">{resource.status}</span>
+                </div>
+                """
+                for resource in page_resources.itertuples(index=False)
+            )
             st.markdown(title_html, unsafe_allow_html=True)
-            with st.expander("View Details", expanded=False):
-                if isinstance(resource.get('details'), dict):
-                    metrics = resource['details'].get('metrics', {})
+        
+            # 메트릭 값은 펼쳐진 메트릭 컬럼에서 페이지 단위로 한 번에 가져옴
+            metric_specs = METRIC_CONFIGS[selected_service]['metrics']
+            metric_values = page_resources[[metric_name for metric_name, _ in metric_specs]].to_numpy()
+        
+            for resource, values in zip(page_resources.itertuples(index=False), metric_values):
+                print("resource :"  , resource)
+                with st.expander(f"{resource.resource_id} - View Details", expanded=False):
+                    metrics = [
+                        (metric_name, unit, value)
+                        for (metric_name, unit), value in zip(metric_specs, values)
+                        if not np.isnan(value)
+                    ]
                     if metrics:
                         metric_cols = st.columns(len(metrics))
-                        for i, (metric_name, metric_data) in enumerate(metrics.items()):
+                        for i, (metric_name, unit, value) in enumerate(metrics):
                             with metric_cols[i]:
-                                st.metric(
-                                    metric_name,
-                                    f"{metric_data['value']} {metric_data['unit']}"
-                                )
+                                st.metric(metric_name, f"{value} {unit}")
                     else:
                         st.info("No metrics available for this resource")
-                else:
-                    st.info("No metrics available for this resource")
 
 # 탭 4: Optimization
 ## 리소스 최적화 추천
@@ -358,29 +562,34 @@ with tab4:
     debug_print("Rendering Optimization tab")
     st.header("Resource Optimization Recommendations")
     
-    recommendations = fetch_recommendations()
-    if not recommendations.empty:
-        total_savings = recommendations['potential_savings'].sum()
-        st.metric("예상 총 절감액", f"${total_savings:.2f}")
+    if tab_opened(4, "Load Recommendations"):
+        # 추천 목록과 캐시 키(수집 시각)를 같은 캐시 객체에서 읽음
+        recommendation_data = fetch_recommendations()
+        recommendations = recommendation_data['recommendations']
+        if not recommendations.empty:
+            total_savings = recommendations['potential_savings'].sum()
+            st.metric("예상 총 절감액", f"${total_savings:.2f}")
         
-        for _, rec in recommendations.iterrows():
-            with st.expander(f"{rec['resource_id']} ({rec['service_type']})에 대한 추천사항"):
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown(f"**유형:** {rec['recommendation_type']}")
-                    st.markdown(f"**사유:** {rec['reason']}")
-                with col2:
-                    st.markdown(f"**예상 절감액:** ${rec['potential_savings']:.2f}")
-                    st.markdown(f"**권장 조치:** {rec['action']}")
+            # 모든 추천사항에 대한 전략을 한 번의 Bedrock 호출로 생성
+            strategies = fetch_recommendation_strategies(recommendation_data['fetched_at'], recommendations)
+        
+            for rec, detailed_strategy in zip(recommendations.itertuples(index=False), strategies):
+                with st.expander(f"{rec.resource_id} ({rec.service_type})에 대한 추천사항"):
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.markdown(f"**유형:** {rec.recommendation_type}")
+                        st.markdown(f"**사유:** {rec.reason}")
+                    with col2:
+                        st.markdown(f"**예상 절감액:** ${rec.potential_savings:.2f}")
+                        st.markdown(f"**권장 조치:** {rec.action}")
                 
-                st.subheader("🤖 AI-Generated Optimization Strategy")
-                detailed_strategy = bedrock_service.enhance_recommendations(rec.to_dict())
-                if detailed_strategy:
-                    st.markdown(detailed_strategy)
-                else:
-                    st.info("현재 최적화 전략을 생성할 수 없습니다.")
-    else:
-        st.info("현재 가능한 최적화 추천사항이 없습니다.")
+                    st.subheader("🤖 AI-Generated Optimization Strategy")
+                    if detailed_strategy:
+                        st.markdown(detailed_strategy)
+                    else:
+                        st.info("현재 최적화 전략을 생성할 수 없습니다.")
+        else:
+            st.info("현재 가능한 최적화 추천사항이 없습니다.")
 
 
 # 탭 5: AWS Expert Chat
@@ -399,33 +608,33 @@ with tab5:
     if st.button("Ask Expert", key="ask_expert_button"):
         if user_question:
             try:
-                # DataFrame을 dict로 변환
-                resources_df = fetch_aws_resources()
-                cost_analysis = fetch_cost_analysis()
-                
-                context = {
-                    'resources': resources_df.to_dict(orient='records') if not resources_df.empty else [],
-                    'cost_data': {
-                        'service_costs': cost_analysis['service_costs'].to_dict(orient='records') if isinstance(cost_analysis, dict) and 'service_costs' in cost_analysis else [],
-                        'region_costs': cost_analysis['region_costs'].to_dict(orient='records') if isinstance(cost_analysis, dict) and 'region_costs' in cost_analysis else [],
-                        'daily_costs': cost_analysis['daily_costs'].to_dict(orient='records') if isinstance(cost_analysis, dict) and 'daily_costs' in cost_analysis else []
-                    } if cost_analysis else {}
-                }
+                # 요약된 컨텍스트 생성 (입력 토큰 수를 계정 규모와 무관하게 제한)
+                # 리소스와 비용 데이터는 서로 독립적이므로 동시에 조회
+                resources_df, cost_bundle = fetch_in_parallel(fetch_aws_resources, fetch_cost_data)
+                context = fetch_chat_context(
+                    resources_df.attrs['fetched_at'],
+                    cost_bundle['fetched_at'],
+                    resources_df,
+                    cost_bundle['cost_analysis']
+                )
                 
                 # 컨텍스트 데이터 로깅
-                debug_print(f"Context data structure: {json.dumps(context, indent=2)}")
+                if DEBUG:
+                    debug_print(f"Context data structure: {json.dumps(context)}")
                 
-                response = bedrock_service.chat_with_aws_expert(user_question, context)
+                # 최신 응답 표시 (스트리밍: 토큰이 도착하는 대로 placeholder 갱신)
+                st.markdown(f"**Q:** {user_question}")
+                answer_placeholder = st.empty()
+                response = ""
+                for text in bedrock_service.chat_with_aws_expert_stream(user_question, context):
+                    response += text
+                    answer_placeholder.markdown(f"**A:** {response}")
                 
                 if response:
                     st.session_state.chat_history.append({
                         "question": user_question,
                         "answer": response
                     })
-                    
-                    # 최신 응답 표시
-                    st.markdown(f"**Q:** {user_question}")
-                    st.markdown(f"**A:** {response}")
                     st.markdown("---")
                 else:
                     st.error("Failed to get response from AWS Expert")
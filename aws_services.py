@@ -1,25 +1,198 @@
 import boto3
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
 import json
+import orjson
+import hashlib
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+# 서비스별 CloudWatch 메트릭 설정
+## namespace, dimension 이름, (메트릭명, 단위) 목록
+
+METRIC_CONFIGS = {
+    'EC2': {
+        'namespace': 'AWS/EC2',
+        'dimension_name': 'InstanceId',
+        'metrics': [
+            ('CPUUtilization', 'Percent'),
+            ('NetworkIn', 'Bytes'),
+            ('NetworkOut', 'Bytes'),
+            ('DiskReadBytes', 'Bytes'),
+            ('DiskWriteBytes', 'Bytes')
+        ]
+    },
+    'RDS': {
+        'namespace': 'AWS/RDS',
+        'dimension_name': 'DBInstanceIdentifier',
+        'metrics': [
+            ('CPUUtilization', 'Percent'),
+            ('FreeableMemory', 'Bytes'),
+            ('DatabaseConnections', 'Count'),
+            ('ReadIOPS', 'Count/Second'),
+            ('WriteIOPS', 'Count/Second')
+        ]
+    },
+    'Lambda': {
+        'namespace': 'AWS/Lambda',
+        'dimension_name': 'FunctionName',
+        'metrics': [
+            ('Invocations', 'Count'),
+            ('Duration', 'Milliseconds'),
+            ('Errors', 'Count'),
+            ('Throttles', 'Count')
+        ]
+    }
+}
+
+# ClientError 분류용 오류 코드
+## 스로틀링은 adaptive retry가 재시도를 모두 소진한 경우이므로 0원으로 숨기지 않고 비용을 NaN(알 수 없음)으로 표시
+## 스로틀링/권한 없음 횟수를 남겨 대시보드에서 결과가 불완전함을 알 수 있도록 함
+
+THROTTLE_ERROR_CODES = ('Throttling', 'ThrottlingException', 'LimitExceededException', 'TooManyRequestsException', 'RequestLimitExceeded')
+DENIED_ERROR_CODES = ('AccessDenied', 'AccessDeniedException', 'UnauthorizedOperation')
+
+# 서비스별 리소스 DataFrame 스키마
+## 컬럼 순서와 dtype을 미리 지정하여 생성 시 타입 추론을 생략하고 하위 로직의 dtype을 고정
+## 반복되는 문자열(리전, 상태, 인스턴스 타입 등)은 category로 저장하여 메모리 사용량 절감
+
+def _metric_schema(service_type):
+    return {metric_name: 'float64' for metric_name, _ in METRIC_CONFIGS[service_type]['metrics']}
+
+BASE_SCHEMA = {
+    'resource_id': 'string',
+    'service_type': 'category',
+    'region': 'category',
+    'status': 'category',
+    'creation_date': 'string',
+    'last_modified': 'string',
+    'tags': 'string',
+    'cost': 'float64'
+}
+
+EC2_SCHEMA = {
+    **BASE_SCHEMA,
+    'instance_type': 'category',
+    'private_ip': 'string',
+    'public_ip': 'string',
+    'vpc_id': 'string',
+    'subnet_id': 'string',
+    **_metric_schema('EC2')
+}
+
+RDS_SCHEMA = {
+    **BASE_SCHEMA,
+    'engine': 'category',
+    'engine_version': 'category',
+    'instance_class': 'category',
+    'storage': 'int64',
+    'endpoint': 'string',
+    **_metric_schema('RDS')
+}
+
+LAMBDA_SCHEMA = {
+    **BASE_SCHEMA,
+    'runtime': 'category',
+    'memory': 'int64',
+    'timeout': 'int64',
+    'handler': 'string',
+    **_metric_schema('Lambda')
+}
+
+S3_SCHEMA = BASE_SCHEMA
+
+# boto3 client 공통 설정
+## adaptive retry: Cost Explorer/CloudWatch 스로틀링(ThrottlingException, LimitExceededException 등) 시
+## 클라이언트 측에서 요청 속도를 낮추며 최대 10회 재시도 (조용히 0원/빈 데이터로 처리되는 것을 방지)
+## 기본 60초 read timeout 대신 짧은 timeout을 사용하여 소켓이 오래 묶이지 않도록 함
+
+CLIENT_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    read_timeout=30,
+    connect_timeout=10,
+    max_pool_connections=50
+)
+
+# GetMetricData 요청당 최대 쿼리 수
+METRIC_DATA_MAX_QUERIES = 500
+
+# 서비스/리전별 비용 사전 조회 결과 재사용 시간 (초)
+COST_PREFETCH_TTL = 300
+
+# 리전별 Lambda 태그(list_tags) 병렬 조회 스레드 수
+LAMBDA_TAG_WORKERS = 16
+
+# S3 버킷별 리전/태그 병렬 조회 스레드 수
+S3_BUCKET_WORKERS = 32
+
+# 리전 목록(describe_regions) 재사용 시간 (초)
+REGIONS_CACHE_TTL = 3600
+
+# 비용 조회 실패 표시 (COST_PREFETCH_TTL 동안 캐시하여 리소스마다 Cost Explorer를 다시 호출하지 않음)
+COST_UNAVAILABLE = object()
+
+# 리소스 단위 비용 조회 기간 (get_cost_and_usage_with_resources는 최근 14일까지만 지원)
+RESOURCE_COST_DAYS = 14
+
+# 서비스/리전별 비용 조회 기간
+SERVICE_COST_DAYS = 30
+
+# 리소스 단위 비용을 사용하는 서비스 (get_cost_and_usage_with_resources는 EC2 리소스 단위 데이터만 제공)
+RESOURCE_COST_SERVICES = ('EC2',)
+
+# 서비스별 수집 결과(DataFrame) 재사용 시간 (초)
+COLLECT_CACHE_TTL = 300
+
+# Cost Explorer 응답 디스크 캐시 위치 및 유효 시간 (초)
+CE_CACHE_DIR = os.path.expanduser('~/.cache/aws_llm_dashboard')
+CE_CACHE_TTL_CURRENT = 6 * 3600
+CE_CACHE_TTL_HISTORICAL = 30 * 24 * 3600
 
 
 # class 초기화 및 기본 설정
 ## AWS 서비스들과 상호작용하기 위한 boto3 client들을 초기화
 ## CloudWatch, EC2, RDS, Lambda, S3, Cost Exploere 서비스들에 대한 클라이언트 생성
+## client_factory(service_name, region_name)를 넘기면 외부에서 공유하는 client(세션/커넥션 풀)를 사용
+## 없으면 하나의 boto3 Session에서 (서비스, 리전)별 client를 한 번만 만들어 재사용 (자격 증명 조회/커넥션 풀 공유)
 
 class AWSResourceCollector:
-    def __init__(self):
+    # 리전 목록은 거의 바뀌지 않으므로 프로세스 내 모든 인스턴스가 REGIONS_CACHE_TTL 동안 공유
+    _REGIONS_CACHE = None
+    _REGIONS_TS = 0
+    _REGIONS_LOCK = threading.Lock()
+
+    def __init__(self, client_factory=None):
         print("Initializing AWSResourceCollector")
-        self.cloudwatch = boto3.client('cloudwatch')
-        self.ec2 = boto3.client('ec2')
-        self.rds = boto3.client('rds')
-        self.lambda_client = boto3.client('lambda')
-        self.s3 = boto3.client('s3')
-        self.ce = boto3.client('ce') # Cost Explorer 클라이언트 추가, https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ce.html
+        self.client_factory = client_factory
+        self._cfg = CLIENT_CONFIG
+        self._client_lock = threading.Lock()
+        self._clients = {}
+        self.session = None if client_factory else boto3.session.Session()
+        self.ce_cache_dir = CE_CACHE_DIR
+        self._cost_cache = None
+        self._cost_cache_ts = 0
+        self._cost_cache_lock = threading.Lock()
+        self._resource_cost_cache = {}
+        self._throttle_count = 0
+        self._denied_count = 0
+        self._error_count_lock = threading.Lock()
+        self._df_cache = {}
+        self._df_cache_ts = {}
+        self._df_cache_locks = {}
+        self._df_cache_lock = threading.Lock()
+        self.cloudwatch = self._client('cloudwatch')
+        self.ec2 = self._client('ec2')
+        self.rds = self._client('rds')
+        self.lambda_client = self._client('lambda')
+        self.s3 = self._client('s3')
+        self.ce = self._client('ce') # Cost Explorer 클라이언트 추가, https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ce.html
         
         self.service_mapping = {
             'EC2': 'Amazon Elastic Compute Cloud - Compute',
@@ -28,15 +201,45 @@ class AWSResourceCollector:
             'S3': 'Amazon Simple Storage Service'
         }
         
-        # 모든 리전 목록 가져오기
-        try:
-            self.regions = [region['RegionName'] for region in self.ec2.describe_regions()['Regions']]
-        except Exception as e:
-            print(f"Error getting regions: {str(e)}")
-            self.regions = ['us-east-1', 'us-west-2', 'ap-northeast-2']  # 기본 리전
+        # 모든 리전 목록 가져오기 (클래스 단위 캐시)
+        self.regions = self._get_regions()
             
         print("AWSResourceCollector initialized")
 
+    def _get_regions(self):
+        """리전 목록 조회 (REGIONS_CACHE_TTL 동안 클래스 캐시 재사용, 실패 시 기본 리전)"""
+        cls = type(self)
+        with cls._REGIONS_LOCK:
+            if cls._REGIONS_CACHE is None or time.time() - cls._REGIONS_TS > REGIONS_CACHE_TTL:
+                try:
+                    cls._REGIONS_CACHE = [region['RegionName'] for region in self.ec2.describe_regions()['Regions']]
+                    cls._REGIONS_TS = time.time()
+                except Exception as e:
+                    print(f"Error getting regions: {str(e)}")
+                    return ['us-east-1', 'us-west-2', 'ap-northeast-2']  # 기본 리전
+            return list(cls._REGIONS_CACHE)
+
+    def _record_client_error(self, e):
+        """ClientError 코드를 스로틀링/권한 없음 카운터에 반영하고 코드 반환"""
+        code = e.response.get('Error', {}).get('Code', '')
+        with self._error_count_lock:
+            if code in THROTTLE_ERROR_CODES:
+                self._throttle_count += 1
+            elif code in DENIED_ERROR_CODES:
+                self._denied_count += 1
+        return code
+
+    def _client(self, service_name, region_name=None):
+        """boto3 client 조회 (client_factory가 있으면 위임, 없으면 공유 Session에서 생성 후 재사용)"""
+        if self.client_factory:
+            return self.client_factory(service_name, region_name)
+        # boto3 Session은 thread-safe하지 않으므로 리전별 병렬 수집 시 client 생성만 직렬화
+        with self._client_lock:
+            key = (service_name, region_name)
+            if key not in self._clients:
+                self._clients[key] = self.session.client(service_name, region_name=region_name, config=self._cfg)
+            return self._clients[key]
+
 # CloudWatch metric 수집
 ## 각 AWS 리소스의 성능 메트릭을 수집
 ## CPU 사용률, 네트웤 I/O, 디스크사용량 등 서비스별 주요 메트릭을 가져옴
@@ -44,81 +247,124 @@ class AWSResourceCollector:
     
     def get_cloudwatch_metrics(self, resource_id, service_type, region, period=3600):
         """CloudWatch 메트릭 데이터 수집"""
+        return self.get_cloudwatch_metrics_batch([resource_id], service_type, region, period).get(resource_id, {})
+
+# CloudWatch metric 일괄 수집
+## 리전 내 여러 리소스의 모든 메트릭을 GetMetricData 한 번(요청당 최대 500개 쿼리)으로 조회
+## 반환값: {resource_id: {metric_name: {'value', 'unit'}}}
+
+    def get_cloudwatch_metrics_batch(self, resource_ids, service_type, region, period=3600):
+        """CloudWatch 메트릭 데이터 일괄 수집 (GetMetricData)"""
+        metrics_by_resource = {resource_id: {} for resource_id in resource_ids}
+        if service_type not in METRIC_CONFIGS or not resource_ids:
+            return metrics_by_resource
         try:
-            cloudwatch = boto3.client('cloudwatch', region_name=region)
-            metrics_data = {}
+            cloudwatch = self._client('cloudwatch', region)
             end_time = datetime.utcnow()
             start_time = end_time - timedelta(hours=1)
+            config = METRIC_CONFIGS[service_type]
 
-            metric_configs = {
-                'EC2': {
-                    'namespace': 'AWS/EC2',
-                    'dimension_name': 'InstanceId',
-                    'metrics': [
-                        ('CPUUtilization', 'Percent'),
-                        ('NetworkIn', 'Bytes'),
-                        ('NetworkOut', 'Bytes'),
-                        ('DiskReadBytes', 'Bytes'),
-                        ('DiskWriteBytes', 'Bytes')
-                    ]
-                },
-                'RDS': {
-                    'namespace': 'AWS/RDS',
-                    'dimension_name': 'DBInstanceIdentifier',
-                    'metrics': [
-                        ('CPUUtilization', 'Percent'),
-                        ('FreeableMemory', 'Bytes'),
-                        ('DatabaseConnections', 'Count'),
-                        ('ReadIOPS', 'Count/Second'),
-                        ('WriteIOPS', 'Count/Second')
-                    ]
-                },
-                'Lambda': {
-                    'namespace': 'AWS/Lambda',
-                    'dimension_name': 'FunctionName',
-                    'metrics': [
-                        ('Invocations', 'Count'),
-                        ('Duration', 'Milliseconds'),
-                        ('Errors', 'Count'),
-                        ('Throttles', 'Count')
-                    ]
-                }
-            }
-
-            if service_type in metric_configs:
-                config = metric_configs[service_type]
+            # 쿼리 Id -> (resource_id, metric_name, unit)
+            queries = []
+            query_targets = {}
+            for r, resource_id in enumerate(resource_ids):
                 dimension = [{'Name': config['dimension_name'], 'Value': resource_id}]
+                for i, (metric_name, unit) in enumerate(config['metrics']):
+                    query_id = f'm{r}_{i}'
+                    query_targets[query_id] = (resource_id, metric_name, unit)
+                    queries.append({
+                        'Id': query_id,
+                        'MetricStat': {
+                            'Metric': {
+                                'Namespace': config['namespace'],
+                                'MetricName': metric_name,
+                                'Dimensions': dimension
+                            },
+                            'Period': period,
+                            'Stat': 'Average'
+                        },
+                        'ReturnData': True
+                    })
 
-                for metric_name, unit in config['metrics']:
-                    try:
-                        response = cloudwatch.get_metric_statistics(
-                            Namespace=config['namespace'],
-                            MetricName=metric_name,
-                            Dimensions=dimension,
-                            StartTime=start_time,
-                            EndTime=end_time,
-                            Period=period,
-                            Statistics=['Average']
-                        )
+            values_by_query = {}
+            for chunk_start in range(0, len(queries), METRIC_DATA_MAX_QUERIES):
+                params = {
+                    'MetricDataQueries': queries[chunk_start:chunk_start + METRIC_DATA_MAX_QUERIES],
+                    'StartTime': start_time,
+                    'EndTime': end_time,
+                    'ScanBy': 'TimestampAscending'
+                }
+                try:
+                    while True:
+                        response = cloudwatch.get_metric_data(**params)
+                        for result in response['MetricDataResults']:
+                            values_by_query.setdefault(result['Id'], []).extend(result['Values'])
+                        if not response.get('NextToken'):
+                            break
+                        params['NextToken'] = response['NextToken']
+                except ClientError as e:
+                    # 메트릭 조회 실패는 리소스 수집 전체를 중단하지 않고 해당 메트릭을 비워둠 (NaN으로 표시)
+                    code = self._record_client_error(e)
+                    print(f"Error getting metric data ({code}): {str(e)}")
+                except BotoCoreError as e:
+                    # ReadTimeout, EndpointConnectionError 등 네트워크 오류도 동일하게 해당 메트릭만 비워둠
+                    print(f"Error getting metric data: {str(e)}")
 
-                        if response['Datapoints']:
-                            metrics_data[metric_name] = {
-                                'value': round(response['Datapoints'][-1]['Average'], 2),
-                                'unit': unit
-                            }
-                    except Exception as e:
-                        print(f"Error getting metric {metric_name}: {str(e)}")
+            for query_id, values in values_by_query.items():
+                if values:
+                    resource_id, metric_name, unit = query_targets[query_id]
+                    metrics_by_resource[resource_id][metric_name] = {
+                        'value': round(values[-1], 2),
+                        'unit': unit
+                    }
 
-            return metrics_data
+            return metrics_by_resource
 
-        except Exception as e:
+        except ClientError as e:
+            code = self._record_client_error(e)
+            print(f"Error getting CloudWatch metrics ({code}): {str(e)}")
+            return metrics_by_resource
+        except BotoCoreError as e:
             print(f"Error getting CloudWatch metrics: {str(e)}")
-            return {}
+            return metrics_by_resource
+
+# 스키마 기반 DataFrame 생성
+## 수집한 row(dict) 목록을 스키마의 컬럼 순서/dtype으로 한 번에 변환 (row가 없어도 컬럼 구성 유지)
+
+    @staticmethod
+    def _to_frame(rows, schema):
+        """row 목록을 스키마가 적용된 DataFrame으로 변환"""
+        return pd.DataFrame.from_records(rows, columns=list(schema)).astype(schema)
+
+# 태그 직렬화
+## EC2/RDS의 [{'Key', 'Value'}] 목록과 Lambda/S3의 dict를 모두 받아 JSON 문자열로 변환
+## 태그가 없는 리소스가 많으므로 빈 경우는 변환/직렬화 없이 '{}' 반환
+
+    @staticmethod
+    def _tags_json(tags):
+        """태그 목록 또는 dict를 JSON 문자열로 직렬화"""
+        if not tags:
+            return '{}'
+        if isinstance(tags, list):
+            tags = {tag['Key']: tag['Value'] for tag in tags}
+        return orjson.dumps(tags).decode()
+
+# 메트릭 컬럼 변환
+## get_cloudwatch_metrics_batch 결과를 메트릭명 -> 값(float) 형태로 펼쳐 DataFrame 컬럼으로 사용
+## 값이 없는 메트릭은 NaN으로 채워 서비스 내 컬럼 구성이 항상 같도록 함
+
+    @staticmethod
+    def _metric_values(metrics, service_type):
+        """리소스의 메트릭 dict를 메트릭명별 값 dict로 변환"""
+        return {
+            metric_name: metrics.get(metric_name, {}).get('value', np.nan)
+            for metric_name, _ in METRIC_CONFIGS[service_type]['metrics']
+        }
 
 
 # 리소스 비용 조회
 ## AWS Cost Explorer를 사용하여 특정 리소스의 비용 정보 조회
-## 최근 30일간의 비용 데이터를 가져옴 --> 이부분도 Customizing 시에 변경해주세요!
+## EC2는 최근 RESOURCE_COST_DAYS(14)일 리소스 단위 비용, 그 외 서비스는 최근 SERVICE_COST_DAYS(30)일 서비스/리전별 비용 사용 --> 이부분도 Customizing 시에 변경해주세요!
 #collect_ec2_data 메서드 내에서 호출:
 #collect_rds_data 메서드 내에서 호출:
 #collect_lambda_data 메서드 내에서 호출:
@@ -159,47 +405,202 @@ class AWSResourceCollector:
     #         return 0.0
 
 
-    #When calling the GetCostAndUsageWithResources operation: 
-    #start date is the max supported days for hourly granularity is 14 days
+    # 리소스마다 Cost Explorer를 호출하지 않고, 서비스별 RESOURCE_ID 그룹 비용을 한 번만 조회하여 재사용
+    # (Cost Explorer는 요청당 과금되고 계정 전체 TPS 한도를 공유함)
+    # 리소스 단위 비용은 EC2만 사용하고, 최근 14일 사용 내역이 없는 인스턴스는 0원
+    # 리소스 단위 비용 데이터가 활성화되어 있지 않으면(AccessDenied 등) 서비스/리전별 비용으로 대체
+    # Cost Explorer 조회가 스로틀링/권한 없음으로 실패하면 리소스는 유지하고 비용만 NaN으로 표시
     def get_resource_cost(self, resource_id, service_type, region):
-        """리소스별 비용 조회 (get_cost_and_usage_with_resources 사용)"""
-        with_resources_days = 14
+        """리소스별 비용 조회 (리소스 단위 비용, 없으면 서비스/리전별 비용 사용)"""
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=with_resources_days)
-            
-            # 필요에 따라 태그 정보도 가져옵니다.
-            tags = self.ec2.describe_tags(Filters=[{'Name': 'resource-id', 'Values': [resource_id]}])['Tags']
-            name_tag = next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), None)
-            print("#############")
-            print(f"Res & Tag : {resource_id}: {name_tag}")
-            print("#############")
-            
-            response = self.ce.get_cost_and_usage_with_resources(
+            if service_type in RESOURCE_COST_SERVICES:
+                resource_costs = self._get_resource_cost_cache(service_type)
+                if resource_costs is COST_UNAVAILABLE:
+                    return np.nan
+                if resource_costs is not None:
+                    return float(resource_costs.get(resource_id, 0.0))
+            service_costs = self._get_cost_cache()
+            if service_costs is COST_UNAVAILABLE:
+                return np.nan
+            return float(service_costs.get((self.service_mapping[service_type], region), 0.0))
+        except Exception as e:
+            print(f"Error getting resource cost: {str(e)}")
+            return np.nan
+
+    def cost_window_days(self, service_type):
+        """get_resource_cost가 해당 서비스에 사용하는 비용 조회 기간(일) 반환"""
+        cached = self._resource_cost_cache.get(service_type)
+        if service_type in RESOURCE_COST_SERVICES and cached is not None and isinstance(cached[1], dict):
+            return RESOURCE_COST_DAYS
+        return SERVICE_COST_DAYS
+
+    def _get_cost_cache(self):
+        """서비스/리전별 비용 캐시 반환 (COST_PREFETCH_TTL 경과 시 재조회, AWS 호출 실패 시 COST_UNAVAILABLE)"""
+        with self._cost_cache_lock:
+            if self._cost_cache is None or time.time() - self._cost_cache_ts > COST_PREFETCH_TTL:
+                try:
+                    self._cost_cache = self._prefetch_costs()
+                except ClientError as e:
+                    code = self._record_client_error(e)
+                    print(f"Error getting service/region cost ({code}): {str(e)}")
+                    self._cost_cache = COST_UNAVAILABLE
+                except BotoCoreError as e:
+                    # EndpointConnectionError, ReadTimeout 등도 실패로 캐시하여 리소스마다 재시도하지 않도록 함
+                    print(f"Error getting service/region cost: {str(e)}")
+                    self._cost_cache = COST_UNAVAILABLE
+                self._cost_cache_ts = time.time()
+            return self._cost_cache
+
+# 리소스 단위 비용 사전 조회
+## EC2 비용을 RESOURCE_ID로 그룹화하여 서비스별로 한 번만 조회하고 COST_PREFETCH_TTL 동안 재사용
+## 데이터 미활성화/권한 없음은 None(서비스/리전별 비용으로 대체), 스로틀링/네트워크 오류는 COST_UNAVAILABLE(NaN)
+
+    def _get_resource_cost_cache(self, service_type):
+        """서비스별 리소스 단위 비용 캐시 반환 (COST_PREFETCH_TTL 경과 시 재조회, 사용 불가 시 None, 스로틀링/네트워크 오류 시 COST_UNAVAILABLE)"""
+        with self._cost_cache_lock:
+            cached = self._resource_cost_cache.get(service_type)
+            if cached is None or time.time() - cached[0] > COST_PREFETCH_TTL:
+                try:
+                    costs = self._prefetch_resource_costs(service_type)
+                except (ClientError, BotoCoreError) as e:
+                    # 실패도 캐시하여 같은 수집 중 다른 리소스가 실패한 조회를 반복하지 않도록 함
+                    print(f"Error getting resource-level cost for {service_type}: {str(e)}")
+                    costs = COST_UNAVAILABLE
+                cached = (time.time(), costs)
+                self._resource_cost_cache[service_type] = cached
+            return cached[1]
+
+    def _prefetch_resource_costs(self, service_type):
+        """최근 RESOURCE_COST_DAYS일 비용을 RESOURCE_ID로 그룹화하여 한 번에 조회 ({resource_id: cost})"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=RESOURCE_COST_DAYS)
+        
+        try:
+            response = self._get_cost_and_usage_with_resources(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
                 },
                 Granularity='MONTHLY',
                 Metrics=['UnblendedCost'],
-                Filter={
-                    'And': [
-                        {'Dimensions': {'Key': 'REGION', 'Values': [region]}},
-                        {'Dimensions': {'Key': 'SERVICE', 'Values': [self.service_mapping[service_type]]}},
-                        {'Dimensions': {'Key': 'RESOURCE_ID', 'Values': [resource_id]}}
-                    ]
-                }
+                Filter={'Dimensions': {'Key': 'SERVICE', 'Values': [self.service_mapping[service_type]]}},
+                GroupBy=[{'Type': 'DIMENSION', 'Key': 'RESOURCE_ID'}]
             )
-            print("service:", [self.service_mapping[service_type]])
-            print(f"Cost Explorer response for {resource_id}: {response}", flush=True)
-            
-            if response['ResultsByTime']:
-                return float(response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
-            return 0.0
-            
+        except ClientError as e:
+            # 리소스 단위 비용 데이터 미활성화(DataUnavailableException)/권한 없음은 서비스/리전별 비용으로 대체
+            if self._record_client_error(e) in THROTTLE_ERROR_CODES:
+                raise
+            print(f"Resource-level cost unavailable for {service_type}, using service/region cost: {str(e)}")
+            return None
+        except BotoCoreError:
+            raise
         except Exception as e:
-            print(f"Error getting resource cost: {str(e)}")
-            return 0.0
+            print(f"Resource-level cost unavailable for {service_type}, using service/region cost: {str(e)}")
+            return None
+        
+        costs = {}
+        for time_period in response['ResultsByTime']:
+            for group in time_period['Groups']:
+                resource_id = group['Keys'][0]
+                costs[resource_id] = costs.get(resource_id, 0.0) + float(group['Metrics']['UnblendedCost']['Amount'])
+        return costs
+
+# Cost Explorer 응답 디스크 캐시
+## 동일한 (TimePeriod, Granularity, Filter, GroupBy ...) 요청은 파라미터 해시를 키로 JSON 파일에 저장하여 재사용
+## 오늘이 포함된 구간은 6시간, 과거 구간은 30일 동안 유효 (Cost Explorer는 요청당 $0.01 과금)
+
+    def _get_cost_and_usage(self, **params):
+        """캐시를 거치는 ce.get_cost_and_usage 호출"""
+        return self._ce_cached('get_cost_and_usage', params)
+
+    def _get_cost_and_usage_with_resources(self, **params):
+        """캐시를 거치는 ce.get_cost_and_usage_with_resources 호출"""
+        return self._ce_cached('get_cost_and_usage_with_resources', params)
+
+    def _ce_cached(self, operation, params):
+        """Cost Explorer 조회 결과를 요청 파라미터 기준으로 디스크 캐시"""
+        key = hashlib.sha1(json.dumps([operation, params], sort_keys=True).encode()).hexdigest()
+        cached = self._ce_cache_get(key, params)
+        if cached is not None:
+            return cached
+        pages = self._ce_paginate(getattr(self.ce, operation), **params)
+        # 모든 페이지의 ResultsByTime을 이어붙여 하나의 응답으로 합침
+        response = {k: v for k, v in pages[0].items() if k != 'NextPageToken'}
+        response['ResultsByTime'] = [result for page in pages for result in page.get('ResultsByTime', [])]
+        self._ce_cache_put(key, response)
+        return response
+
+    def _ce_paginate(self, op, **kwargs):
+        """NextPageToken을 따라가며 모든 페이지 반환 (Cost Explorer는 boto3 paginator 미지원)"""
+        pages = []
+        token = None
+        while True:
+            page = op(**kwargs, **({'NextPageToken': token} if token else {}))
+            pages.append(page)
+            token = page.get('NextPageToken')
+            if not token:
+                return pages
+
+    def _ce_cache_get(self, key, params):
+        path = os.path.join(self.ce_cache_dir, f'ce_{key}.json')
+        includes_today = params['TimePeriod']['End'] >= datetime.now().strftime('%Y-%m-%d')
+        ttl = CE_CACHE_TTL_CURRENT if includes_today else CE_CACHE_TTL_HISTORICAL
+        try:
+            if time.time() - os.path.getmtime(path) < ttl:
+                with open(path) as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _ce_cache_put(self, key, response):
+        try:
+            os.makedirs(self.ce_cache_dir, exist_ok=True)
+            response = {k: v for k, v in response.items() if k != 'ResponseMetadata'}
+            with open(os.path.join(self.ce_cache_dir, f'ce_{key}.json'), 'w') as f:
+                json.dump(response, f)
+        except (OSError, TypeError) as e:
+            print(f"Error writing Cost Explorer cache: {str(e)}")
+
+    def _prefetch_costs(self):
+        """최근 SERVICE_COST_DAYS일 비용을 SERVICE, REGION으로 그룹화하여 한 번에 조회"""
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=SERVICE_COST_DAYS)
+        
+        response = self._get_cost_and_usage(
+            TimePeriod={
+                'Start': start_date.strftime('%Y-%m-%d'),
+                'End': end_date.strftime('%Y-%m-%d')
+            },
+            Granularity='MONTHLY',
+            Metrics=['UnblendedCost'],
+            GroupBy=[
+                {'Type': 'DIMENSION', 'Key': 'SERVICE'},
+                {'Type': 'DIMENSION', 'Key': 'REGION'}
+            ]
+        )
+        
+        # 30일 구간이 두 달에 걸치면 ResultsByTime이 여러 개이므로 합산
+        costs = {}
+        for time_period in response['ResultsByTime']:
+            for group in time_period['Groups']:
+                key = tuple(group['Keys'])
+                costs[key] = costs.get(key, 0.0) + float(group['Metrics']['UnblendedCost']['Amount'])
+        return costs
+
+    # 최근 30일 동안 비용이 발생한 리전만 수집 대상으로 사용 (빈 리전의 describe_* 왕복 생략)
+    # 비용 조회가 실패하거나 활성 리전이 없으면 전체 리전으로 대체
+    def _active_regions(self):
+        """비용이 발생한 리전 목록 반환"""
+        try:
+            costs = self._get_cost_cache()
+        except Exception as e:
+            print(f"Error getting active regions: {str(e)}")
+            return self.regions
+        if costs is COST_UNAVAILABLE:
+            return self.regions
+        active = {region for (_, region), cost in costs.items() if cost > 0}
+        return [region for region in self.regions if region in active] or self.regions
 
 # EC2 데이터 수집
 ## 모든 리전의 EC2 instance 정보를 수집
@@ -212,58 +613,69 @@ class AWSResourceCollector:
         try:
             ec2_data = []
             
-            for region in self.regions:
-                try:
-                    ec2_client = boto3.client('ec2', region_name=region)
-                    response = ec2_client.describe_instances()
-                    
-                    for reservation in response['Reservations']:
-                        for instance in reservation['Instances']:
-                            try:
-                                metrics = self.get_cloudwatch_metrics(
-                                    instance['InstanceId'], 
-                                    'EC2', 
-                                    region
-                                )
-                                
-                                cost = self.get_resource_cost(
-                                    instance['InstanceId'],
-                                    'EC2',
-                                    region
-                                )
-                                
-                                instance_data = {
-                                    'resource_id': instance['InstanceId'],
-                                    'service_type': 'EC2',
-                                    'region': region,
-                                    'status': instance['State']['Name'],
-                                    'creation_date': instance['LaunchTime'].strftime('%Y-%m-%d %H:%M:%S'),
-                                    'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                    'tags': json.dumps({tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}),
-                                    'cost': cost,
-                                    'details': {
-                                        'instance_type': instance['InstanceType'],
-                                        'private_ip': instance.get('PrivateIpAddress', ''),
-                                        'public_ip': instance.get('PublicIpAddress', ''),
-                                        'vpc_id': instance.get('VpcId', ''),
-                                        'subnet_id': instance.get('SubnetId', ''),
-                                        'metrics': metrics
-                                    }
-                                }
-                                ec2_data.append(instance_data)
-                            except Exception as e:
-                                print(f"Error processing EC2 instance {instance['InstanceId']}: {str(e)}")
-                                continue
-                except Exception as e:
-                    print(f"Error processing region {region}: {str(e)}")
-                    continue
+            # 리전별 수집을 병렬로 수행 (I/O 대기 시간이 겹치도록)
+            regions = self._active_regions()
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # 수집 시각은 한 번만 계산해 모든 row에 사용
+            with ThreadPoolExecutor(max_workers=min(32, len(regions))) as executor:
+                for rows in executor.map(lambda region: self._collect_ec2_region(region, now_str), regions):
+                    ec2_data.extend(rows)
             
-            return pd.DataFrame(ec2_data)
+            return self._to_frame(ec2_data, EC2_SCHEMA)
             
         except Exception as e:
             print(f"Error collecting EC2 data: {str(e)}")
             return pd.DataFrame()
 
+    def _collect_ec2_region(self, region, now_str):
+        """리전별 EC2 인스턴스 데이터 수집"""
+        rows = []
+        try:
+            ec2_client = self._client('ec2', region)
+            paginator = ec2_client.get_paginator('describe_instances')
+            reservations = [reservation for page in paginator.paginate() for reservation in page['Reservations']]
+                    
+            # 리전 내 모든 인스턴스의 메트릭을 한 번에 조회
+            metrics_by_id = self.get_cloudwatch_metrics_batch(
+                [instance['InstanceId'] for reservation in reservations for instance in reservation['Instances']],
+                'EC2',
+                region
+            )
+                    
+            for reservation in reservations:
+                for instance in reservation['Instances']:
+                    try:
+                        metrics = metrics_by_id.get(instance['InstanceId'], {})
+                                
+                        cost = self.get_resource_cost(
+                            instance['InstanceId'],
+                            'EC2',
+                            region
+                        )
+                                
+                        instance_data = {
+                            'resource_id': instance['InstanceId'],
+                            'service_type': 'EC2',
+                            'region': region,
+                            'status': instance['State']['Name'],
+                            'creation_date': instance['LaunchTime'].strftime('%Y-%m-%d %H:%M:%S'),
+                            'last_modified': now_str,
+                            'tags': self._tags_json(instance.get('Tags')),
+                            'cost': cost,
+                            'instance_type': instance['InstanceType'],
+                            'private_ip': instance.get('PrivateIpAddress', ''),
+                            'public_ip': instance.get('PublicIpAddress', ''),
+                            'vpc_id': instance.get('VpcId', ''),
+                            'subnet_id': instance.get('SubnetId', ''),
+                            **self._metric_values(metrics, 'EC2')
+                        }
+                        rows.append(instance_data)
+                    except Exception as e:
+                        print(f"Error processing EC2 instance {instance['InstanceId']}: {str(e)}")
+                        continue
+        except Exception as e:
+            print(f"Error processing region {region}: {str(e)}")
+        return rows
+
 
 # RDS 데이터 수집
 ## 모든 리전의 RDS 데이터베이스 인스턴스 정보 수집
@@ -275,56 +687,67 @@ class AWSResourceCollector:
         try:
             rds_data = []
             
-            for region in self.regions:
-                try:
-                    rds_client = boto3.client('rds', region_name=region)
-                    response = rds_client.describe_db_instances()
+            # 리전별 수집을 병렬로 수행 (I/O 대기 시간이 겹치도록)
+            regions = self._active_regions()
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # 수집 시각은 한 번만 계산해 모든 row에 사용
+            with ThreadPoolExecutor(max_workers=min(32, len(regions))) as executor:
+                for rows in executor.map(lambda region: self._collect_rds_region(region, now_str), regions):
+                    rds_data.extend(rows)
+            
+            return self._to_frame(rds_data, RDS_SCHEMA)
+            
+        except Exception as e:
+            print(f"Error collecting RDS data: {str(e)}")
+            return pd.DataFrame()
+
+    def _collect_rds_region(self, region, now_str):
+        """리전별 RDS 인스턴스 데이터 수집"""
+        rows = []
+        try:
+            rds_client = self._client('rds', region)
+            paginator = rds_client.get_paginator('describe_db_instances')
+            db_instances = [instance for page in paginator.paginate() for instance in page['DBInstances']]
                     
-                    for instance in response['DBInstances']:
-                        try:
-                            metrics = self.get_cloudwatch_metrics(
-                                instance['DBInstanceIdentifier'],
-                                'RDS',
-                                region
-                            )
+            # 리전 내 모든 DB 인스턴스의 메트릭을 한 번에 조회
+            metrics_by_id = self.get_cloudwatch_metrics_batch(
+                [instance['DBInstanceIdentifier'] for instance in db_instances],
+                'RDS',
+                region
+            )
+                    
+            for instance in db_instances:
+                try:
+                    metrics = metrics_by_id.get(instance['DBInstanceIdentifier'], {})
                             
-                            cost = self.get_resource_cost(
-                                instance['DBInstanceIdentifier'],
-                                'RDS',
-                                region
-                            )
+                    cost = self.get_resource_cost(
+                        instance['DBInstanceIdentifier'],
+                        'RDS',
+                        region
+                    )
                             
-                            instance_data = {
-                                'resource_id': instance['DBInstanceIdentifier'],
-                                'service_type': 'RDS',
-                                'region': region,
-                                'status': instance['DBInstanceStatus'],
-                                'creation_date': instance['InstanceCreateTime'].strftime('%Y-%m-%d %H:%M:%S'),
-                                'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                'tags': json.dumps({tag['Key']: tag['Value'] for tag in instance.get('TagList', [])}),
-                                'cost': cost,
-                                'details': {
-                                    'engine': instance['Engine'],
-                                    'engine_version': instance['EngineVersion'],
-                                    'instance_class': instance['DBInstanceClass'],
-                                    'storage': instance['AllocatedStorage'],
-                                    'endpoint': instance.get('Endpoint', {}).get('Address', ''),
-                                    'metrics': metrics
-                                }
-                            }
-                            rds_data.append(instance_data)
-                        except Exception as e:
-                            print(f"Error processing RDS instance {instance['DBInstanceIdentifier']}: {str(e)}")
-                            continue
+                    instance_data = {
+                        'resource_id': instance['DBInstanceIdentifier'],
+                        'service_type': 'RDS',
+                        'region': region,
+                        'status': instance['DBInstanceStatus'],
+                        'creation_date': instance['InstanceCreateTime'].strftime('%Y-%m-%d %H:%M:%S'),
+                        'last_modified': now_str,
+                        'tags': self._tags_json(instance.get('TagList')),
+                        'cost': cost,
+                        'engine': instance['Engine'],
+                        'engine_version': instance['EngineVersion'],
+                        'instance_class': instance['DBInstanceClass'],
+                        'storage': instance['AllocatedStorage'],
+                        'endpoint': instance.get('Endpoint', {}).get('Address', ''),
+                        **self._metric_values(metrics, 'RDS')
+                    }
+                    rows.append(instance_data)
                 except Exception as e:
-                    print(f"Error processing region {region}: {str(e)}")
+                    print(f"Error processing RDS instance {instance['DBInstanceIdentifier']}: {str(e)}")
                     continue
-            
-            return pd.DataFrame(rds_data)
-            
         except Exception as e:
-            print(f"Error collecting RDS data: {str(e)}")
-            return pd.DataFrame()
+            print(f"Error processing region {region}: {str(e)}")
+        return rows
 
 
 # Lambda 데이터 수집
@@ -337,151 +760,217 @@ class AWSResourceCollector:
         try:
             lambda_data = []
             
-            for region in self.regions:
-                try:
-                    lambda_client = boto3.client('lambda', region_name=region)
-                    paginator = lambda_client.get_paginator('list_functions')
-                    
-                    for page in paginator.paginate():
-                        for function in page['Functions']:
-                            try:
-                                metrics = self.get_cloudwatch_metrics(
-                                    function['FunctionName'],
-                                    'Lambda',
-                                    region
-                                )
-                                
-                                cost = self.get_resource_cost(
-                                    function['FunctionName'],
-                                    'Lambda',
-                                    region
-                                )
-                                
-                                # 태그 정보 가져오기
-                                tags_response = lambda_client.list_tags(
-                                    Resource=function['FunctionArn']
-                                )
-                                
-                                # LastModified 처리
-                                if isinstance(function['LastModified'], str):
-                                    last_modified = function['LastModified']
-                                else:
-                                    try:
-                                        last_modified = function['LastModified'].strftime('%Y-%m-%d %H:%M:%S')
-                                    except:
-                                        last_modified = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                
-                                function_data = {
-                                    'resource_id': function['FunctionName'],
-                                    'service_type': 'Lambda',
-                                    'region': region,
-                                    'status': 'Active',
-                                    'creation_date': last_modified,
-                                    'last_modified': last_modified,
-                                    'tags': json.dumps(tags_response.get('Tags', {})),
-                                    'cost': cost,
-                                    'details': {
-                                        'runtime': function.get('Runtime', ''),
-                                        'memory': function.get('MemorySize', 0),
-                                        'timeout': function.get('Timeout', 0),
-                                        'handler': function.get('Handler', ''),
-                                        'metrics': metrics
-                                    }
-                                }
-                                lambda_data.append(function_data)
-                            except Exception as e:
-                                print(f"Error processing Lambda function {function['FunctionName']}: {str(e)}")
-                                continue
-                except Exception as e:
-                    print(f"Error processing region {region}: {str(e)}")
-                    continue
+            # 리전별 수집을 병렬로 수행 (I/O 대기 시간이 겹치도록)
+            regions = self._active_regions()
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # 수집 시각은 한 번만 계산해 모든 row에 사용
+            with ThreadPoolExecutor(max_workers=min(32, len(regions))) as executor:
+                for rows in executor.map(lambda region: self._collect_lambda_region(region, now_str), regions):
+                    lambda_data.extend(rows)
             
-            return pd.DataFrame(lambda_data)
+            return self._to_frame(lambda_data, LAMBDA_SCHEMA)
             
         except Exception as e:
             print(f"Error collecting Lambda data: {str(e)}")
             return pd.DataFrame()
 
-# S3 데이터 수집
-## 모든 S3 버킷의 정보를 수집
-## 버킷 이름, 생성일, 태그 등의 정보 수집
-    
-    def collect_s3_data(self):
-        """S3 버킷 데이터 수집"""
-        print("Collecting S3 data...")
+    def _collect_lambda_region(self, region, now_str):
+        """리전별 Lambda 함수 데이터 수집"""
+        rows = []
         try:
-            s3_data = []
-            
-            response = self.s3.list_buckets()
-            
-            for bucket in response['Buckets']:
-                try:
-                    # 버킷 리전 확인
-                    region = self.s3.get_bucket_location(Bucket=bucket['Name'])
-                    region = region['LocationConstraint'] or 'us-east-1'
+            lambda_client = self._client('lambda', region)
+            paginator = lambda_client.get_paginator('list_functions')
+            functions = [function for page in paginator.paginate() for function in page['Functions']]
                     
-                    # 버킷 태그 가져오기
-                    try:
-                        tags_response = self.s3.get_bucket_tagging(Bucket=bucket['Name'])
-                        tags = {tag['Key']: tag['Value'] for tag in tags_response['TagSet']}
-                    except:
-                        tags = {}
+            # 리전 내 모든 함수의 메트릭을 한 번에 조회
+            metrics_by_name = self.get_cloudwatch_metrics_batch(
+                [function['FunctionName'] for function in functions],
+                'Lambda',
+                region
+            )
+            
+            # 함수별 태그 조회(list_tags)는 함수마다 1회씩 필요하므로 병렬로 수행
+            function_arns = [function['FunctionArn'] for function in functions]
+            with ThreadPoolExecutor(max_workers=LAMBDA_TAG_WORKERS) as executor:
+                tags_by_arn = dict(zip(
+                    function_arns,
+                    executor.map(lambda arn: self._list_lambda_tags(lambda_client, arn), function_arns)
+                ))
                     
+            for function in functions:
+                try:
+                    metrics = metrics_by_name.get(function['FunctionName'], {})
+                            
                     cost = self.get_resource_cost(
-                        bucket['Name'],
-                        'S3',
+                        function['FunctionName'],
+                        'Lambda',
                         region
                     )
-                    
-                    bucket_data = {
-                        'resource_id': bucket['Name'],
-                        'service_type': 'S3',
+                            
+                    # LastModified 처리
+                    if isinstance(function['LastModified'], str):
+                        last_modified = function['LastModified']
+                    else:
+                        try:
+                            last_modified = function['LastModified'].strftime('%Y-%m-%d %H:%M:%S')
+                        except:
+                            last_modified = now_str
+                            
+                    function_data = {
+                        'resource_id': function['FunctionName'],
+                        'service_type': 'Lambda',
                         'region': region,
                         'status': 'Active',
-                        'creation_date': bucket['CreationDate'].strftime('%Y-%m-%d %H:%M:%S'),
-                        'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'tags': json.dumps(tags),
+                        'creation_date': last_modified,
+                        'last_modified': last_modified,
+                        'tags': self._tags_json(tags_by_arn[function['FunctionArn']]),
                         'cost': cost,
-                        'details': {
-                            'creation_date': bucket['CreationDate'].strftime('%Y-%m-%d %H:%M:%S')
-                        }
+                        'runtime': function.get('Runtime', ''),
+                        'memory': function.get('MemorySize', 0),
+                        'timeout': function.get('Timeout', 0),
+                        'handler': function.get('Handler', ''),
+                        **self._metric_values(metrics, 'Lambda')
                     }
-                    s3_data.append(bucket_data)
+                    rows.append(function_data)
                 except Exception as e:
-                    print(f"Error processing bucket {bucket['Name']}: {str(e)}")
+                    print(f"Error processing Lambda function {function['FunctionName']}: {str(e)}")
                     continue
+        except Exception as e:
+            print(f"Error processing region {region}: {str(e)}")
+        return rows
+
+    def _list_lambda_tags(self, lambda_client, function_arn):
+        """Lambda 함수 태그 조회 (실패 시 빈 dict)"""
+        try:
+            return lambda_client.list_tags(Resource=function_arn).get('Tags', {})
+        except Exception as e:
+            print(f"Error getting tags for Lambda function {function_arn}: {str(e)}")
+            return {}
+
+# S3 데이터 수집
+## 모든 S3 버킷의 정보를 수집
+## 버킷 이름, 생성일, 태그 등의 정보 수집
+    
+    def collect_s3_data(self):
+        """S3 버킷 데이터 수집"""
+        print("Collecting S3 data...")
+        try:
+            s3_data = []
+            now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')  # 수집 시각은 한 번만 계산해 모든 row에 사용
             
-            return pd.DataFrame(s3_data)
+            response = self.s3.list_buckets()
+            
+            # 버킷별 리전/태그 조회를 병렬로 수행 (실패한 버킷은 None)
+            with ThreadPoolExecutor(max_workers=S3_BUCKET_WORKERS) as executor:
+                for bucket_data in executor.map(lambda bucket: self._collect_s3_bucket(bucket, now_str), response['Buckets']):
+                    if bucket_data is not None:
+                        s3_data.append(bucket_data)
+            
+            return self._to_frame(s3_data, S3_SCHEMA)
             
         except Exception as e:
             print(f"Error collecting S3 data: {str(e)}")
             return pd.DataFrame()
 
+    def _collect_s3_bucket(self, bucket, now_str):
+        """버킷별 S3 데이터 수집"""
+        try:
+            # 버킷 리전 확인
+            region = self.s3.get_bucket_location(Bucket=bucket['Name'])
+            region = region['LocationConstraint'] or 'us-east-1'
+            
+            # 버킷 태그 가져오기
+            try:
+                tags_response = self.s3.get_bucket_tagging(Bucket=bucket['Name'])
+                tags = {tag['Key']: tag['Value'] for tag in tags_response['TagSet']}
+            except:
+                tags = {}
+            
+            cost = self.get_resource_cost(
+                bucket['Name'],
+                'S3',
+                region
+            )
+            
+            return {
+                'resource_id': bucket['Name'],
+                'service_type': 'S3',
+                'region': region,
+                'status': 'Active',
+                'creation_date': bucket['CreationDate'].strftime('%Y-%m-%d %H:%M:%S'),
+                'last_modified': now_str,
+                'tags': self._tags_json(tags),
+                'cost': cost
+            }
+        except Exception as e:
+            print(f"Error processing bucket {bucket['Name']}: {str(e)}")
+            return None
+
 # 병렬로 모든 리소스 데이터 수집
+## iter_resources는 서비스별 수집이 끝나는 순서대로 (서비스명, DataFrame)을 반환하여 먼저 끝난 결과부터 사용할 수 있음
+## collect_all_resources는 전체 결과를 서비스 순서(EC2, RDS, Lambda, S3)대로 합쳐 하나의 DataFrame으로 반환
+    
+    def iter_resources(self):
+        """서비스별 리소스 데이터를 수집이 완료되는 순서대로 반환 (generator)"""
+        collection_methods = {
+            'ec2': self.collect_ec2_data,
+            'rds': self.collect_rds_data,
+            'lambda': self.collect_lambda_data,
+            's3': self.collect_s3_data
+        }
+        
+        # 병렬로 데이터 수집
+        with ThreadPoolExecutor(max_workers=len(collection_methods)) as executor:
+            futures = {
+                executor.submit(self._cached_collect, name, method): name
+                for name, method in collection_methods.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    print(f"Error collecting {name} resources: {str(e)}")
+                    continue
+                if not df.empty:
+                    yield name, df
     
     def collect_all_resources(self):
         """모든 리소스 데이터 수집"""
         print("Collecting all resources...")
-        dfs = []
-        collection_methods = [
-            self.collect_ec2_data,
-            self.collect_rds_data,
-            self.collect_lambda_data,
-            self.collect_s3_data
-        ]
+        order = ['ec2', 'rds', 'lambda', 's3']
+        throttled, denied = self.error_counts()
+        dfs = sorted(self.iter_resources(), key=lambda item: order.index(item[0]))
         
-        # 병렬로 데이터 수집
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            results = list(executor.map(lambda method: method(), collection_methods))
-            
-        for df in results:
-            if not df.empty:
-                dfs.append(df)
-        
-        result = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
-        print(f"All resources collected: {len(result)} resources")
+        result = pd.concat([df for _, df in dfs], ignore_index=True) if dfs else pd.DataFrame()
+        # 이번 수집 중 발생한 스로틀링/권한 없음 횟수를 결과에 기록 (화면에서 결과가 불완전함을 표시)
+        result.attrs['throttled'] = self._throttle_count - throttled
+        result.attrs['denied'] = self._denied_count - denied
+        print(f"All resources collected: {len(result)} resources (throttled: {result.attrs['throttled']}, denied: {result.attrs['denied']})")
         return result
 
+    def error_counts(self):
+        """누적 (스로틀링, 권한 없음) 횟수 반환"""
+        with self._error_count_lock:
+            return self._throttle_count, self._denied_count
+
+
+# 수집 결과 메모리 캐시
+## collect_all_resources와 get_optimization_recommendations가 같은 EC2/RDS 수집을 반복하지 않도록 TTL 동안 재사용
+## 동시에 같은 수집이 요청되면 먼저 시작한 수집이 끝날 때까지 기다렸다가 결과를 공유
+
+    def _cached_collect(self, name, fn, ttl=COLLECT_CACHE_TTL):
+        """수집 함수 결과를 name 기준으로 ttl초 동안 캐시"""
+        with self._df_cache_lock:
+            lock = self._df_cache_locks.setdefault(name, threading.Lock())
+        with lock:
+            now = time.time()
+            if name in self._df_cache and now - self._df_cache_ts[name] < ttl:
+                return self._df_cache[name]
+            df = fn()
+            self._df_cache[name] = df
+            self._df_cache_ts[name] = now
+            return df
+
 
 # 비용 분석 및 예측
 ## 서비스별, 리전별, 일별 비용 데이터를 수집하고 분석
@@ -495,7 +984,7 @@ class AWSResourceCollector:
             start_date = end_date - timedelta(days=30)
             
             # 서비스별 비용
-            service_response = self.ce.get_cost_and_usage(
+            service_response = self._get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
@@ -505,16 +994,13 @@ class AWSResourceCollector:
                 GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
             )
             
-            service_costs = pd.DataFrame([
-                {
-                    'SERVICE': group['Keys'][0],
-                    'cost': float(group['Metrics']['UnblendedCost']['Amount'])
-                }
-                for group in service_response['ResultsByTime'][0]['Groups']
-            ])
+            # 30일 구간이 두 달에 걸치는 경우를 포함하여 모든 기간/페이지의 그룹을 합산
+            service_costs = self._groups_frame(
+                service_response['ResultsByTime'], 'SERVICE'
+            ).groupby('SERVICE', as_index=False)['cost'].sum()
             
             # 리전별 비용
-            region_response = self.ce.get_cost_and_usage(
+            region_response = self._get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
@@ -524,16 +1010,12 @@ class AWSResourceCollector:
                 GroupBy=[{'Type': 'DIMENSION', 'Key': 'REGION'}]
             )
             
-            region_costs = pd.DataFrame([
-                {
-                    'REGION': group['Keys'][0],
-                    'cost': float(group['Metrics']['UnblendedCost']['Amount'])
-                }
-                for group in region_response['ResultsByTime'][0]['Groups']
-            ])
+            region_costs = self._groups_frame(
+                region_response['ResultsByTime'], 'REGION'
+            ).groupby('REGION', as_index=False)['cost'].sum()
             
             # 일별 비용
-            daily_response = self.ce.get_cost_and_usage(
+            daily_response = self._get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
@@ -543,17 +1025,7 @@ class AWSResourceCollector:
                 GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
             )
             
-            daily_costs = []
-            for time_period in daily_response['ResultsByTime']:
-                date = time_period['TimePeriod']['Start']
-                for group in time_period['Groups']:
-                    daily_costs.append({
-                        'date': date,
-                        'SERVICE': group['Keys'][0],
-                        'cost': float(group['Metrics']['UnblendedCost']['Amount'])
-                    })
-            
-            daily_costs_df = pd.DataFrame(daily_costs)
+            daily_costs_df = self._groups_frame(daily_response['ResultsByTime'], 'SERVICE', with_date=True)
             
             return {
                 'service_costs': service_costs,
@@ -561,11 +1033,39 @@ class AWSResourceCollector:
                 'daily_costs': daily_costs_df
             }
             
-        except Exception as e:
+        except ClientError as e:
+            code = self._record_client_error(e)
+            print(f"Error in cost analysis ({code}): {str(e)}")
+            return None
+        except BotoCoreError as e:
             print(f"Error in cost analysis: {str(e)}")
             return None
 
 
+# Cost Explorer 그룹 결과 -> DataFrame 변환
+## ResultsByTime[].Groups[]를 pd.json_normalize로 한 번에 펼치고 첫 번째 그룹 키와 금액(float64) 컬럼만 남김
+## with_date=True이면 각 기간의 시작일을 date 컬럼으로 추가 (일별 비용)
+
+    @staticmethod
+    def _groups_frame(results_by_time, key_name, with_date=False):
+        """Cost Explorer ResultsByTime을 [date,] key_name, cost 컬럼의 DataFrame으로 변환"""
+        columns = (['date'] if with_date else []) + [key_name, 'cost']
+        groups = pd.json_normalize(
+            results_by_time,
+            record_path='Groups',
+            meta=[['TimePeriod', 'Start']] if with_date else None
+        )
+        if groups.empty:
+            return pd.DataFrame(columns=columns).astype({'cost': 'float64'})
+        frame = pd.DataFrame({
+            key_name: groups['Keys'].str[0],
+            'cost': groups['Metrics.UnblendedCost.Amount'].astype('float64')
+        })
+        if with_date:
+            frame.insert(0, 'date', groups['TimePeriod.Start'])
+        return frame[columns]
+
+
 # 비용예측
 ## 현재 간단한 로직으로 구성하였지만 해커톤 이후 예측 모델을 개발하시거나 혹은 가지고 계신 모델이 있으시면 이부분에 embedding 하시면 편리하게 활용하실 수 있습니다.
 ## days 도 필요시 변경해주세요!
@@ -578,7 +1078,7 @@ class AWSResourceCollector:
             start_date = end_date - timedelta(days=days)
             
             # 서비스별 비용 데이터 수집
-            response = self.ce.get_cost_and_usage(
+            response = self._get_cost_and_usage(
                 TimePeriod={
                     'Start': start_date.strftime('%Y-%m-%d'),
                     'End': end_date.strftime('%Y-%m-%d')
@@ -588,46 +1088,55 @@ class AWSResourceCollector:
                 GroupBy=[{'Type': 'DIMENSION', 'Key': 'SERVICE'}]
             )
             
-            # 서비스별 비용 예측
+            # 응답을 (date, service, cost) DataFrame으로 한 번에 변환
+            daily_costs = self._groups_frame(response['ResultsByTime'], 'service', with_date=True)
+            daily_costs = daily_costs[daily_costs['cost'] > 0].sort_values('date')  # 0이 아닌 비용만 포함
+            
+            # 서비스별 비용 예측 (일별 비용에 대한 선형 회귀)
             predictions = {}
-            for service in self.service_mapping.keys():
-                service_costs = []
-                dates = []
-                for time_period in response['ResultsByTime']:
-                    for group in time_period['Groups']:
-                        if group['Keys'][0] == self.service_mapping[service]:
-                            cost = float(group['Metrics']['UnblendedCost']['Amount'])
-                            if cost > 0:  # 0이 아닌 비용만 포함
-                                service_costs.append(cost)
-                                dates.append(pd.to_datetime(time_period['TimePeriod']['Start']))
+            for service, mapped_service in self.service_mapping.items():
+                service_costs = daily_costs.loc[daily_costs['service'] == mapped_service, 'cost'].to_numpy()
+                if service_costs.size == 0:
+                    continue
                 
-                if service_costs:
-                    df = pd.DataFrame({'date': dates, 'cost': service_costs})
-                    df = df.set_index('date')
-                    
-                    # 간단한 선형 회귀로 변경
-                    current_daily_avg = df['cost'].mean()
-                    if len(df) > 1:
-                        trend = (df['cost'].iloc[-1] - df['cost'].iloc[0]) / len(df)
-                    else:
-                        trend = 0
-                    
-                    predicted_daily_avg = current_daily_avg + trend
-                    
-                    predictions[service] = {
-                        'current_daily_avg': current_daily_avg,
-                        'predicted_daily_avg': max(0, predicted_daily_avg),  # 음수 방지
-                        'trend': 'increasing' if trend > 0 else 'decreasing' if trend < 0 else 'stable',
-                        'predicted_next_month': max(0, predicted_daily_avg * 30)
-                    }
+                current_daily_avg = float(service_costs.mean())
+                if service_costs.size > 1:
+                    trend, intercept = np.polyfit(np.arange(service_costs.size), service_costs, 1)
+                    predicted_daily_avg = float(intercept + trend * service_costs.size)  # 다음 날 예측값
+                else:
+                    trend = 0
+                    predicted_daily_avg = current_daily_avg
+                
+                predictions[service] = {
+                    'current_daily_avg': current_daily_avg,
+                    'predicted_daily_avg': max(0, predicted_daily_avg),  # 음수 방지
+                    'trend': self._trend_label(trend, current_daily_avg),
+                    'predicted_next_month': max(0, predicted_daily_avg * 30)
+                }
             
             print(f"Cost predictions generated: {predictions}")
             return predictions
             
-        except Exception as e:
+        except ClientError as e:
+            code = self._record_client_error(e)
+            print(f"Error predicting costs ({code}): {str(e)}")
+            return None
+        except BotoCoreError as e:
             print(f"Error predicting costs: {str(e)}")
             return None
 
+
+# 추세 라벨
+## polyfit 기울기는 일정한 비용에서도 ±1e-16 수준의 오차가 있으므로 일 평균 비용 대비 상대 허용 오차 이내는 stable로 판단
+
+    @staticmethod
+    def _trend_label(trend, current_daily_avg):
+        """일별 비용 기울기를 increasing/decreasing/stable 라벨로 변환"""
+        if np.isclose(trend, 0, atol=max(abs(current_daily_avg), 1.0) * 1e-9):
+            return 'stable'
+        return 'increasing' if trend > 0 else 'decreasing'
+
+
 # 활용을 위한 최적화 추천
 ## 리소스 사용 패턴을 활용해서 비용 최적화 추천사항을 생성 (향후 로직 embedding  )
 ## 저사용 인스턴스, 중지된 리소스 등을 식별
@@ -637,60 +1146,55 @@ class AWSResourceCollector:
         print("Getting optimization recommendations...")
         try:
             recommendations = []
+            rec_columns = ['resource_id', 'tags', 'service_type', 'recommendation_type', 'reason', 'potential_savings', 'action']
             
             # EC2 인스턴스 분석
-            ec2_data = self.collect_ec2_data()
+            ec2_data = self._cached_collect('ec2', self.collect_ec2_data)
             if not ec2_data.empty:
-                for _, instance in ec2_data.iterrows():
-                    metrics = instance['details'].get('metrics', {})
-                    
-                    # CPU 사용률 기반 추천
-                    if 'CPUUtilization' in metrics:
-                        cpu_util = metrics['CPUUtilization']['value']
-                        if cpu_util < 20:
-                            recommendations.append({
-                                'resource_id': instance['resource_id'],
-                                'tags': instance['tags'],
-                                'service_type': 'EC2',
-                                'recommendation_type': 'Downsizing',
-                                'reason': f'Low CPU utilization ({cpu_util}%)',
-                                'potential_savings': instance['cost'] * 0.5,
-                                'action': 'Consider using a smaller instance type'
-                            })
-                    
-                    # 중지된 인스턴스 확인
-                    if instance['status'] == 'stopped':
-                        recommendations.append({
-                            'resource_id': instance['resource_id'],
-                            'tags': instance['tags'],
-                            'service_type': 'EC2',
-                            'recommendation_type': 'Termination',
-                            'reason': 'Instance is stopped',
-                            'potential_savings': instance['cost'],
-                            'action': 'Consider terminating if not needed'
-                        })
+                cpu = ec2_data['CPUUtilization']
+                
+                # CPU 사용률 기반 추천
+                low_cpu = ec2_data[cpu < 20]
+                recommendations.append(low_cpu.assign(
+                    service_type='EC2',
+                    recommendation_type='Downsizing',
+                    reason='Low CPU utilization (' + low_cpu['CPUUtilization'].astype(str) + '%)',
+                    potential_savings=low_cpu['cost'] * 0.5,
+                    action='Consider using a smaller instance type'
+                ).reindex(columns=rec_columns))
+                
+                # 중지된 인스턴스 확인
+                stopped = ec2_data[ec2_data['status'] == 'stopped']
+                recommendations.append(stopped.assign(
+                    service_type='EC2',
+                    recommendation_type='Termination',
+                    reason='Instance is stopped',
+                    potential_savings=stopped['cost'],
+                    action='Consider terminating if not needed'
+                ).reindex(columns=rec_columns))
             
             # RDS 인스턴스 분석
-            rds_data = self.collect_rds_data()
+            rds_data = self._cached_collect('rds', self.collect_rds_data)
             if not rds_data.empty:
-                for _, instance in rds_data.iterrows():
-                    metrics = instance['details'].get('metrics', {})
-                    
-                    # 연결 수 기반 추천
-                    if 'DatabaseConnections' in metrics:
-                        connections = metrics['DatabaseConnections']['value']
-                        if connections < 5:
-                            recommendations.append({
-                                'resource_id': instance['resource_id'],
-                                'service_type': 'RDS',
-                                'recommendation_type': 'Downsizing',
-                                'reason': f'Low number of connections ({connections})',
-                                'potential_savings': instance['cost'] * 0.4,
-                                'action': 'Consider using a smaller instance class'
-                            })
+                connections = rds_data['DatabaseConnections']
+                
+                # 연결 수 기반 추천
+                low_conn = rds_data[connections < 5]
+                recommendations.append(low_conn.assign(
+                    service_type='RDS',
+                    recommendation_type='Downsizing',
+                    reason='Low number of connections (' + low_conn['DatabaseConnections'].astype(str) + ')',
+                    potential_savings=low_conn['cost'] * 0.4,
+                    action='Consider using a smaller instance class'
+                ).reindex(columns=rec_columns).drop(columns='tags'))
+            
+            recommendations = [rec for rec in recommendations if not rec.empty]
+            if not recommendations:
+                return pd.DataFrame()
+            recommendations = pd.concat(recommendations, ignore_index=True)
             
             print(f"Recommendations generated: {recommendations}")
-            return pd.DataFrame(recommendations)
+            return recommendations
             
         except Exception as e:
             print(f"Error generating recommendations: {str(e)}")
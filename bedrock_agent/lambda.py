@@ -1,15 +1,76 @@
 import boto3
+from botocore.config import Config
 import json
-import pandas as pd
+import asyncio
+import logging
+import os
+try:
+    import orjson  # 선택 의존성: Lambda 레이어에 포함된 경우에만 사용
+except ImportError:
+    orjson = None
+try:
+    import aioboto3  # 선택 의존성: 설치된 경우 lambda_handler가 비동기 수집 사용
+except ImportError:
+    aioboto3 = None
 from datetime import datetime, timedelta
-import numpy as np
+import threading
+from types import MappingProxyType
+from functools import lru_cache
 
-service_mapping = {
+# 로그 레벨 (기본 WARNING), 상세 응답 덤프는 LOG_LEVEL=DEBUG일 때만 출력
+## Lambda는 로그 출력/CloudWatch Logs 수집 시간도 과금 시간에 포함되므로 기본은 오류만 기록
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING'))
+
+# GetMetricData 요청당 최대 쿼리 수
+METRIC_DATA_MAX_QUERIES = 500
+
+# boto3 client 공통 설정 (병렬 호출 시 커넥션 풀 크기 확보, 스로틀링은 adaptive retry로 처리)
+CLIENT_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    max_pool_connections=32
+)
+
+# (서비스, 리전)별 client를 모듈 단위로 한 번만 생성하여 재사용 (warm invoke 간에도 유지)
+# 기본 boto3 세션은 thread-safe하지 않으므로 client 생성은 직렬화
+_clients = {}
+_client_lock = threading.Lock()
+
+def get_client(service_name, region_name=None):
+    with _client_lock:
+        key = (service_name, region_name)
+        if key not in _clients:
+            _clients[key] = boto3.client(service_name, region_name=region_name, config=CLIENT_CONFIG)
+        return _clients[key]
+
+def dumps(obj):
+    """공백 없는 JSON 문자열 직렬화 (orjson이 있으면 orjson, 없으면 표준 json)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+# 서비스 약어 -> Cost Explorer SERVICE 값 (읽기 전용, 스레드 간 안전하게 공유)
+SERVICE_MAPPING = MappingProxyType({
             'EC2': 'Amazon Elastic Compute Cloud - Compute',
             'RDS': 'Amazon Relational Database Service',
             'Lambda': 'AWS Lambda',
             'S3': 'Amazon Simple Storage Service'
-        }
+        })
+
+# 서비스별 CloudWatch 메트릭 설정 (namespace, dimension, (메트릭명, 단위) 튜플), 호출마다 재생성하지 않도록 모듈 단위로 한 번만 정의
+_METRIC_CONFIGS = MappingProxyType({
+            'EC2': MappingProxyType({
+                'namespace': 'AWS/EC2',
+                'dimension_name': 'InstanceId',
+                'metrics': (
+                    ('CPUUtilization', 'Percent'),
+                    ('NetworkIn', 'Bytes'),
+                    ('NetworkOut', 'Bytes'),
+                    ('DiskReadBytes', 'Bytes'),
+                    ('DiskWriteBytes', 'Bytes')
+                )
+            })
+        })
 
 
 def get_named_parameter(event, name):
@@ -31,99 +92,120 @@ def get_named_parameter(event, name):
             return param['value']
     return None
 
-def get_resource_cost(resource_id, service_type, region):
-        """리소스별 비용 조회 (get_cost_and_usage_with_resources 사용)"""
-        with_resources_days = 14
+def collect_region_resource_costs(region, service_type, now=None):
+        """리전/서비스 내 모든 리소스의 비용을 RESOURCE_ID로 그룹화하여 한 번에 조회 ({resource_id: cost})
+        같은 날짜의 반복 호출(warm invoke)은 캐시된 결과를 재사용합니다.
+        """
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=with_resources_days)
-            
-            ec2 = boto3.client('ec2')
-            ce = boto3.client('ce') 
-            # 필요에 따라 태그 정보도 가져옵니다.
-            tags = ec2.describe_tags(Filters=[{'Name': 'resource-id', 'Values': [resource_id]}])['Tags']
-            name_tag = next((tag['Value'] for tag in tags if tag['Key'] == 'Name'), None)
+            return _region_resource_costs((now or datetime.now()).strftime('%Y-%m-%d'), region, service_type)
+        except Exception as e:
+            logger.error("Error getting region resource costs: %s", e)
+            return {}
+
+@lru_cache(maxsize=32)
+def _region_resource_costs(date_str, region, service_type):
+        # 실패한 조회는 예외로 빠져나가므로 캐시되지 않음
+        end_date = datetime.strptime(date_str, '%Y-%m-%d')
+        start_date = end_date - timedelta(days=14)
+        ce = get_client('ce')
+        svc = SERVICE_MAPPING[service_type]
+        
+        params = {
+            'TimePeriod': {
+                'Start': start_date.strftime('%Y-%m-%d'),
+                'End': date_str
+            },
+            'Granularity': 'MONTHLY',
+            'Metrics': ['UnblendedCost'],
+            'Filter': {
+                'And': [
+                    {'Dimensions': {'Key': 'REGION', 'Values': [region]}},
+                    {'Dimensions': {'Key': 'SERVICE', 'Values': [svc]}}
+                ]
+            },
+            'GroupBy': [{'Type': 'DIMENSION', 'Key': 'RESOURCE_ID'}]
+        }
+        
+        costs = {}
+        while True:
+            response = ce.get_cost_and_usage_with_resources(**params)
+            for time_period in response['ResultsByTime']:
+                for group in time_period['Groups']:
+                    resource_id = group['Keys'][0]
+                    costs[resource_id] = costs.get(resource_id, 0.0) + float(group['Metrics']['UnblendedCost']['Amount'])
+            if not response.get('NextPageToken'):
+                return costs
+            params['NextPageToken'] = response['NextPageToken']
+
+def process_instance(instance, region, metrics_by_id, cost_by_id, now_str):
+        """EC2 인스턴스 1개의 결과 dict 구성 (실패 시 None)"""
+        try:
+            metrics = metrics_by_id.get(instance['InstanceId'], {})
+            cost = cost_by_id.get(instance['InstanceId'], 0.0)
             
-            response = ce.get_cost_and_usage_with_resources(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                Filter={
-                    'And': [
-                        {'Dimensions': {'Key': 'REGION', 'Values': [region]}},
-                        {'Dimensions': {'Key': 'SERVICE', 'Values': [service_mapping[service_type]]}},
-                        {'Dimensions': {'Key': 'RESOURCE_ID', 'Values': [resource_id]}}
-                    ]
+            return {
+                'resource_id': instance['InstanceId'],
+                'service_type': 'EC2',
+                'region': region,
+                'status': instance['State']['Name'],
+                'creation_date': instance['LaunchTime'].strftime('%Y-%m-%d %H:%M:%S'),
+                'last_modified': now_str,
+                'tags': dumps({tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}),
+                'cost': cost,
+                'details': {
+                    'instance_type': instance['InstanceType'],
+                    'private_ip': instance.get('PrivateIpAddress', ''),
+                    'public_ip': instance.get('PublicIpAddress', ''),
+                    'vpc_id': instance.get('VpcId', ''),
+                    'subnet_id': instance.get('SubnetId', ''),
+                    'metrics': metrics
                 }
-            )
-            print("service:", [service_mapping[service_type]])
-            print(f"Cost Explorer response for {resource_id}: {response}", flush=True)
-            
-            if response['ResultsByTime']:
-                return float(response['ResultsByTime'][0]['Total']['UnblendedCost']['Amount'])
-            return 0.0
-            
+            }
         except Exception as e:
-            print(f"Error getting resource cost: {str(e)}")
-            return 0.0
+            logger.error("Error processing EC2 instance %s: %s", instance['InstanceId'], e)
+            return None
+
+def iter_instances(ec2_client):
+        """describe_instances 전체 페이지를 순회하며 인스턴스를 하나씩 반환 (1000개 초과 계정에서도 누락 없음)"""
+        paginator = ec2_client.get_paginator('describe_instances')
+        for page in paginator.paginate(PaginationConfig={'PageSize': 500}):
+            for reservation in page['Reservations']:
+                yield from reservation['Instances']
 
 def collect_ec2_data(region):
         """EC2 인스턴스 데이터 수집"""
-        print("Collecting EC2 data...")
+        logger.debug("Collecting EC2 data...")
         try:
             ec2_data = []
+            # 수집 시각/메트릭 조회 구간은 호출당 한 번만 계산하여 모든 인스턴스에 사용
+            now = datetime.now()
+            now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+            end_time = datetime.utcnow()
             
             try:
                 if not region:
-                    print("No region specified, collecting data from all regions...")
+                    logger.debug("No region specified, collecting data from all regions...")
                     
-                ec2_client = boto3.client('ec2', region_name=region)
-                response = ec2_client.describe_instances()
-                for reservation in response['Reservations']:
-                    for instance in reservation['Instances']:
-                        try:
-                            metrics = get_cloudwatch_metrics_ec2(
-                                instance['InstanceId'], 
-                                'EC2', 
-                                region
-                            )
-                            
-                            cost = get_resource_cost(
-                                instance['InstanceId'],
-                                'EC2',
-                                region
-                            )
-                            
-                            instance_data = {
-                                'resource_id': instance['InstanceId'],
-                                'service_type': 'EC2',
-                                'region': region,
-                                'status': instance['State']['Name'],
-                                'creation_date': instance['LaunchTime'].strftime('%Y-%m-%d %H:%M:%S'),
-                                'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                                'tags': json.dumps({tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}),
-                                'cost': cost,
-                                'details': {
-                                    'instance_type': instance['InstanceType'],
-                                    'private_ip': instance.get('PrivateIpAddress', ''),
-                                    'public_ip': instance.get('PublicIpAddress', ''),
-                                    'vpc_id': instance.get('VpcId', ''),
-                                    'subnet_id': instance.get('SubnetId', ''),
-                                    'metrics': metrics
-                                }
-                            }
-                            ec2_data.append(instance_data)
-                        except Exception as e:
-                            print(f"Error processing EC2 instance {instance['InstanceId']}: {str(e)}")
-                            continue
+                ec2_client = get_client('ec2', region)
+                instances = list(iter_instances(ec2_client))
+                instance_ids = [instance['InstanceId'] for instance in instances]
+                
+                # 리전 내 모든 인스턴스의 메트릭을 GetMetricData로 한 번에 조회
+                metrics_by_id = get_cloudwatch_metrics_ec2_batch(instance_ids, 'EC2', region, end_time=end_time)
+                
+                # 인스턴스마다 Cost Explorer를 호출하지 않고 리전 내 EC2 비용을 RESOURCE_ID별로 한 번에 조회
+                cost_by_id = collect_region_resource_costs(region, 'EC2', now)
+                
+                # 메트릭/비용은 미리 조회했으므로 인스턴스별 처리는 API 호출 없이 dict 구성만 수행
+                for instance in instances:
+                    instance_data = process_instance(instance, region, metrics_by_id, cost_by_id, now_str)
+                    if instance_data is not None:
+                        ec2_data.append(instance_data)
             except Exception as e:
-                print(f"Error processing region {region}: {str(e)}")
+                logger.error("Error processing region %s: %s", region, e)
             
-            # DataFrame을 dict 형태로 변환 후 JSON 문자열로 변환
-            json_data = json.dumps(pd.DataFrame(ec2_data).to_dict(orient='records'))
+            # 수집한 dict 목록을 바로 JSON 문자열로 변환 (pandas 불필요)
+            json_data = dumps(ec2_data)
             # return {
             #     'statusCode': 200,
             #     'body': json_data
@@ -131,61 +213,162 @@ def collect_ec2_data(region):
             return json_data
             
         except Exception as e:
-            print(f"Error collecting EC2 data: {str(e)}")
+            logger.error("Error collecting EC2 data: %s", e)
             return {"statusCode": 500, "body": "Error collecting EC2 data"}
 
 
-def get_cloudwatch_metrics_ec2(resource_id, service_type, region, period=3600):
-        """CloudWatch 메트릭 EC2 데이터 수집"""
+def build_metric_queries(resource_ids, service_type, period=3600):
+        """GetMetricData 쿼리 목록과 쿼리 Id(m{리소스 순번}_{메트릭 순번}) -> (resource_id, metric_name, unit) 매핑 생성
+        지원하지 않는 서비스면 빈 목록을 반환합니다.
+        """
+        queries = []
+        query_targets = {}
+        if service_type not in _METRIC_CONFIGS:
+            return queries, query_targets
+
+        config = _METRIC_CONFIGS[service_type]
+        for r, resource_id in enumerate(resource_ids):
+            dimension = [{'Name': config['dimension_name'], 'Value': resource_id}]
+            for i, (metric_name, unit) in enumerate(config['metrics']):
+                query_id = f'm{r}_{i}'
+                query_targets[query_id] = (resource_id, metric_name, unit)
+                queries.append({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': config['namespace'],
+                            'MetricName': metric_name,
+                            'Dimensions': dimension
+                        },
+                        'Period': period,
+                        'Stat': 'Average'
+                    },
+                    'ReturnData': True
+                })
+        return queries, query_targets
+
+def metrics_from_values(resource_ids, values_by_query, query_targets):
+        """쿼리 Id별 값 목록을 {resource_id: {metric_name: {'value', 'unit'}}}로 변환 (가장 최근 값 사용)"""
+        metrics_by_resource = {resource_id: {} for resource_id in resource_ids}
+        for query_id, values in values_by_query.items():
+            if values:
+                resource_id, metric_name, unit = query_targets[query_id]
+                metrics_by_resource[resource_id][metric_name] = {
+                    'value': round(values[-1], 2),
+                    'unit': unit
+                }
+        return metrics_by_resource
+
+def get_cloudwatch_metrics_ec2_batch(resource_ids, service_type, region, period=3600, end_time=None):
+        """CloudWatch 메트릭 EC2 데이터 일괄 수집 (GetMetricData, 요청당 최대 500개 쿼리)
+        end_time을 넘기면 해당 시각까지 1시간 구간을 조회 (없으면 현재 시각 기준)
+        반환값: {resource_id: {metric_name: {'value', 'unit'}}}
+        """
         try:
-            cloudwatch = boto3.client('cloudwatch', region_name=region)
-            metrics_data = {}
-            end_time = datetime.utcnow()
+            queries, query_targets = build_metric_queries(resource_ids, service_type, period)
+            if not queries:
+                return {resource_id: {} for resource_id in resource_ids}
+
+            cloudwatch = get_client('cloudwatch', region)
+            end_time = end_time or datetime.utcnow()
             start_time = end_time - timedelta(hours=1)
 
-            metric_configs = {
-                'EC2': {
-                    'namespace': 'AWS/EC2',
-                    'dimension_name': 'InstanceId',
-                    'metrics': [
-                        ('CPUUtilization', 'Percent'),
-                        ('NetworkIn', 'Bytes'),
-                        ('NetworkOut', 'Bytes'),
-                        ('DiskReadBytes', 'Bytes'),
-                        ('DiskWriteBytes', 'Bytes')
-                    ]
+            values_by_query = {}
+            for chunk_start in range(0, len(queries), METRIC_DATA_MAX_QUERIES):
+                params = {
+                    'MetricDataQueries': queries[chunk_start:chunk_start + METRIC_DATA_MAX_QUERIES],
+                    'StartTime': start_time,
+                    'EndTime': end_time,
+                    'ScanBy': 'TimestampAscending'
                 }
-            }
+                try:
+                    while True:
+                        response = cloudwatch.get_metric_data(**params)
+                        for result in response['MetricDataResults']:
+                            values_by_query.setdefault(result['Id'], []).extend(result['Values'])
+                        if not response.get('NextToken'):
+                            break
+                        params['NextToken'] = response['NextToken']
+                except Exception as e:
+                    logger.error("Error getting metric data: %s", e)
 
-            if service_type in metric_configs:
-                config = metric_configs[service_type]
-                dimension = [{'Name': config['dimension_name'], 'Value': resource_id}]
-
-                for metric_name, unit in config['metrics']:
-                    try:
-                        response = cloudwatch.get_metric_statistics(
-                            Namespace=config['namespace'],
-                            MetricName=metric_name,
-                            Dimensions=dimension,
-                            StartTime=start_time,
-                            EndTime=end_time,
-                            Period=period,
-                            Statistics=['Average']
-                        )
-
-                        if response['Datapoints']:
-                            metrics_data[metric_name] = {
-                                'value': round(response['Datapoints'][-1]['Average'], 2),
-                                'unit': unit
-                            }
-                    except Exception as e:
-                        print(f"Error getting metric {metric_name}: {str(e)}")
-
-            return metrics_data
+            return metrics_from_values(resource_ids, values_by_query, query_targets)
 
         except Exception as e:
-            print(f"Error getting CloudWatch metrics: {str(e)}")
-            return {}
+            logger.error("Error getting CloudWatch metrics: %s", e)
+            return {resource_id: {} for resource_id in resource_ids}
+
+async def get_cloudwatch_metrics_ec2_batch_async(cloudwatch, resource_ids, service_type, period=3600, end_time=None):
+        """get_cloudwatch_metrics_ec2_batch의 aioboto3 버전 (cloudwatch는 aioboto3 client)"""
+        try:
+            queries, query_targets = build_metric_queries(resource_ids, service_type, period)
+            end_time = end_time or datetime.utcnow()
+            start_time = end_time - timedelta(hours=1)
+
+            values_by_query = {}
+            for chunk_start in range(0, len(queries), METRIC_DATA_MAX_QUERIES):
+                params = {
+                    'MetricDataQueries': queries[chunk_start:chunk_start + METRIC_DATA_MAX_QUERIES],
+                    'StartTime': start_time,
+                    'EndTime': end_time,
+                    'ScanBy': 'TimestampAscending'
+                }
+                while True:
+                    response = await cloudwatch.get_metric_data(**params)
+                    for result in response['MetricDataResults']:
+                        values_by_query.setdefault(result['Id'], []).extend(result['Values'])
+                    if not response.get('NextToken'):
+                        break
+                    params['NextToken'] = response['NextToken']
+
+            return metrics_from_values(resource_ids, values_by_query, query_targets)
+
+        except Exception as e:
+            logger.error("Error getting CloudWatch metrics: %s", e)
+            return {resource_id: {} for resource_id in resource_ids}
+
+async def collect_ec2_data_async(region):
+        """EC2 인스턴스 데이터 수집 (aioboto3 사용)
+        describe_instances 이후 메트릭(GetMetricData)과 비용(Cost Explorer) 조회를 동시에 수행합니다.
+        """
+        logger.debug("Collecting EC2 data (async)...")
+        try:
+            ec2_data = []
+            now = datetime.now()
+            now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+            end_time = datetime.utcnow()
+            
+            try:
+                session = aioboto3.Session()
+                async with session.client('ec2', region_name=region, config=CLIENT_CONFIG) as ec2_client, \
+                        session.client('cloudwatch', region_name=region, config=CLIENT_CONFIG) as cloudwatch:
+                    paginator = ec2_client.get_paginator('describe_instances')
+                    instances = [
+                        instance
+                        async for page in paginator.paginate()
+                        for reservation in page['Reservations']
+                        for instance in reservation['Instances']
+                    ]
+                    instance_ids = [instance['InstanceId'] for instance in instances]
+                    
+                    # 비용 조회는 날짜 단위 캐시(lru_cache)를 공유하도록 동기 함수를 스레드에서 실행
+                    metrics_by_id, cost_by_id = await asyncio.gather(
+                        get_cloudwatch_metrics_ec2_batch_async(cloudwatch, instance_ids, 'EC2', end_time=end_time),
+                        asyncio.to_thread(collect_region_resource_costs, region, 'EC2', now)
+                    )
+                
+                for instance in instances:
+                    instance_data = process_instance(instance, region, metrics_by_id, cost_by_id, now_str)
+                    if instance_data is not None:
+                        ec2_data.append(instance_data)
+            except Exception as e:
+                logger.error("Error processing region %s: %s", region, e)
+            
+            return dumps(ec2_data)
+            
+        except Exception as e:
+            logger.error("Error collecting EC2 data: %s", e)
+            return {"statusCode": 500, "body": "Error collecting EC2 data"}
 
 def lambda_handler(event, context):
     action_group = event.get('actionGroup', '')
@@ -194,7 +377,11 @@ def lambda_handler(event, context):
 
     if function == 'collect_ec2_data':
         region = get_named_parameter(event,"region")
-        output = collect_ec2_data(region)    
+        # aioboto3가 설치되어 있으면 비동기 수집, 없으면 기존 동기 수집 사용
+        if aioboto3 is not None:
+            output = asyncio.run(collect_ec2_data_async(region))
+        else:
+            output = collect_ec2_data(region)
 
     else:
         output = 'Invalid function'
@@ -203,11 +390,12 @@ def lambda_handler(event, context):
         'actionGroup': action_group,
         'function': function,
         'functionResponse': {
-            'responseBody': {'TEXT': {'body': json.dumps(output)}}
+            'responseBody': {'TEXT': {'body': dumps(output)}}
         }
     }
 
     function_response = {'response': action_response, 'messageVersion': message_version}
-    print("Response: {}".format(function_response))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Response: %s", dumps(function_response))
 
     return function_response
\ No newline at end of file
@@ -1,29 +1,71 @@
 import boto3
+from botocore.config import Config
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import orjson
 import os
+import re
+import threading
 import pandas as pd
 
+# Bedrock 클라이언트 공통 설정
+## adaptive 재시도 모드는 클라이언트 측 토큰 버킷으로 스로틀링 전에 요청 속도를 낮춤
+CLIENT_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    max_pool_connections=50
+)
+
+# 모델 응답에서 JSON 객체 추출 (한 단계 중첩까지 허용, 앞뒤 설명 문장은 무시)
+_JSON_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+
+# 모델 응답에서 전략 문자열 JSON 배열 추출 (문자열 안의 괄호/따옴표 이스케이프 허용)
+_JSON_ARRAY_RE = re.compile(r'\[\s*"(?:[^"\\]|\\.)*"(?:\s*,\s*"(?:[^"\\]|\\.)*")*\s*\]', re.DOTALL)
+
+# 추천사항 일괄 강화 설정
+## 호출당 추천사항 수, 추천사항당 응답 토큰 수, 동시 호출 수 --> 응답이 잘리면 토큰 수를 늘려주세요!
+RECOMMENDATION_BATCH_SIZE = 5
+RECOMMENDATION_TOKENS_PER_ITEM = 800
+RECOMMENDATION_WORKERS = 4
+
+# 채팅 응답 캐시 크기 (같은 질문 + 같은 컨텍스트는 Bedrock 재호출 없이 반환)
+CHAT_CACHE_SIZE = 128
+
 
 class BedrockService:
 # 클래스 초기화
 ## AWS Bedrock 서비스 클라이언트 초기화
 ## us-east-1 리전 사용 (리전은 oregon으로 설정했습니다)
 ## Claude 3 Sonnet 을 기본 모델로 설정 (변경 필요하면 시도해보셔도 좋습니다)
+## 짧은 구조화 추출(자연어 쿼리 파싱)은 latency-optimized 추론을 지원하는 Claude 3.5 Haiku 사용
+## latency-optimized 추론은 us-east-2 리전의 cross-region inference profile에서 지원됩니다
+## 채팅 응답은 프롬프트 해시를 키로 하는 LRU 캐시에 보관 (cache_resource로 모든 세션 스레드가 공유하므로 lock으로 보호)
 
     def __init__(self):
         self.bedrock_runtime = boto3.client(
             service_name='bedrock-runtime',
-            region_name='us-east-1'
+            region_name='us-east-1',
+            config=CLIENT_CONFIG
         )
         self.model_id = 'anthropic.claude-3-sonnet-20240229-v1:0'
+        self.fast_bedrock_runtime = boto3.client(
+            service_name='bedrock-runtime',
+            region_name='us-east-2',
+            config=CLIENT_CONFIG
+        )
+        self.fast_model_id = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+        self._chat_cache = OrderedDict()
+        self._chat_cache_lock = threading.Lock()
 
 # 모델 호출
 ## Bedrock 모델 호출
 ## Prompt: 입력 텍스트
 ## max_tokens : 최대 응답 토큰 수
 ## temperature : 응답의 창의성 정도 (실험 필요시 조정하여 활용하실 수 있습니다)
+## fast : True인 경우 Claude 3.5 Haiku를 latency-optimized 모드로 호출
     
-    def invoke_model(self, prompt, max_tokens=1000, temperature=0.7):
+    def invoke_model(self, prompt, max_tokens=1000, temperature=0.7, fast=False):
         try:
             body = {
                 "anthropic_version": "bedrock-2023-05-31",
@@ -37,21 +79,65 @@ class BedrockService:
                 "temperature": temperature
             }
             
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(body)
-            )
+            if fast:
+                response = self.fast_bedrock_runtime.invoke_model(
+                    modelId=self.fast_model_id,
+                    body=orjson.dumps(body),
+                    performanceConfigLatency='optimized'
+                )
+            else:
+                response = self.bedrock_runtime.invoke_model(
+                    modelId=self.model_id,
+                    body=orjson.dumps(body)
+                )
             
-            response_body = json.loads(response['body'].read())
+            response_body = orjson.loads(response['body'].read())
             return response_body['content'][0]['text']
             
         except Exception as e:
             print(f"Error invoking Bedrock model: {str(e)}")
             return None
 
+# 스트리밍 모델 호출
+## invoke_model_with_response_stream을 사용하여 생성되는 텍스트 조각을 순서대로 반환 (generator)
+## 전체 응답을 기다리지 않고 첫 토큰부터 화면에 표시할 수 있음
+## 파라미터는 invoke_model과 동일
+
+    def invoke_model_stream(self, prompt, max_tokens=1000, temperature=0.7):
+        try:
+            yield from self._iter_stream_text(prompt, max_tokens, temperature)
+        except Exception as e:
+            print(f"Error invoking Bedrock model stream: {str(e)}")
+
+    # 스트림 텍스트 조각 반환 (예외는 호출자에게 전달)
+    def _iter_stream_text(self, prompt, max_tokens, temperature):
+        body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": temperature
+        }
+        
+        response = self.bedrock_runtime.invoke_model_with_response_stream(
+            modelId=self.model_id,
+            body=orjson.dumps(body)
+        )
+        
+        for event in response['body']:
+            if 'chunk' not in event:
+                continue
+            chunk = orjson.loads(event['chunk']['bytes'])
+            if chunk.get('type') == 'content_block_delta':
+                yield chunk['delta'].get('text', '')
+
 # open search 연결 전 레벨에서의 자연어 쿼리 처리
 ## 자연어로 된 쿼리를 AWS 리소스 필터 파라미터로 전환
-## 반환값: service_type, region, status를 포함하는 JSON 객체
+## 반환값: service_type, region, status를 포함하는 JSON 객체 (Bedrock 호출/JSON 파싱 실패 시 None)
 ## JSON 파싱로직 포함
 
     def process_natural_language_query(self, query):
@@ -68,21 +154,17 @@ class BedrockService:
             }}
             """
             
-            response = self.invoke_model(prompt, max_tokens=500, temperature=0)
+            response = self.invoke_model(prompt, max_tokens=500, temperature=0, fast=True)
             if response:
                 try:
                     # JSON 문자열에서 실제 JSON 객체 부분만 추출
-                    json_str = response.strip()
-                    if '{' in json_str and '}' in json_str:
-                        json_str = json_str[json_str.find('{'):json_str.rfind('}')+1]
-                    return json.loads(json_str)
-                except json.JSONDecodeError as e:
+                    match = _JSON_RE.search(response)
+                    json_str = match.group(0) if match else response.strip()
+                    return orjson.loads(json_str)
+                except json.JSONDecodeError as e:  # orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스
+                    # 파싱 실패는 필터가 없는 정상 결과(모든 값 null)와 구분되도록 None 반환
                     print(f"Error parsing JSON response: {str(e)}")
-                    return {
-                        "service_type": None,
-                        "region": None,
-                        "status": None
-                    }
+                    return None
             return None
         except Exception as e:
             print(f"Error in process_natural_language_query: {str(e)}")
@@ -91,15 +173,26 @@ class BedrockService:
 # 비용 인사이트 생성
 ## AWS 비용 데이터를 분석하여 인사이트 제공
 ## 주요 비용 요인, 비정상패턴, 최적화 기회, 트랜드 등 분석
-## DataFrame을 dict로 변환하여 처리함
+## 전체 행 대신 상위 서비스/리전과 주별 비용 합계로 요약하여 프롬프트 토큰 수를 줄임
 
     def generate_cost_insights(self, cost_data):
         try:
             cost_data_dict = {
-                'service_costs': cost_data['service_costs'].to_dict(orient='records'),
-                'region_costs': cost_data['region_costs'].to_dict(orient='records'),
-                'daily_costs': cost_data['daily_costs'].to_dict(orient='records') if 'daily_costs' in cost_data else []
+                'top_service_costs': cost_data['service_costs'][['SERVICE', 'cost']].nlargest(10, 'cost').to_dict(orient='records'),
+                'top_region_costs': cost_data['region_costs'][['REGION', 'cost']].nlargest(5, 'cost').to_dict(orient='records'),
+                'weekly_costs': []
             }
+            daily_costs = cost_data.get('daily_costs')
+            if daily_costs is not None and not daily_costs.empty:
+                weekly_costs = (
+                    daily_costs.assign(date=pd.to_datetime(daily_costs['date']))
+                    .groupby(pd.Grouper(key='date', freq='W'))['cost'].sum()
+                    .round(2)
+                )
+                cost_data_dict['weekly_costs'] = [
+                    {'week_ending': week.strftime('%Y-%m-%d'), 'cost': cost}
+                    for week, cost in weekly_costs.items()
+                ]
     
             prompt = f"""
             다음 AWS 비용 데이터를 분석하여 상세한 인사이트를 제공해주세요:
@@ -165,31 +258,135 @@ class BedrockService:
 
 
 
+# 추천 사항 일괄 강화
+## 추천사항을 RECOMMENDATION_BATCH_SIZE개씩 묶어 Bedrock을 병렬로 호출 (묶음별 응답 토큰 수는 추천사항 수에 비례)
+## 한 묶음의 응답이 잘리거나 파싱에 실패해도 해당 묶음만 None으로 처리
+## 반환값: 입력 순서와 동일한 전략 문자열 리스트 (파싱 실패 시 None으로 채움)
+
+    def enhance_recommendations_batch(self, recommendations):
+        if isinstance(recommendations, pd.DataFrame):
+            recommendations = recommendations.to_dict(orient='records')
+        if not recommendations:
+            return []
+        chunks = [
+            recommendations[i:i + RECOMMENDATION_BATCH_SIZE]
+            for i in range(0, len(recommendations), RECOMMENDATION_BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=min(RECOMMENDATION_WORKERS, len(chunks))) as executor:
+            return [strategy for strategies in executor.map(self._enhance_recommendations_chunk, chunks) for strategy in strategies]
+
+    def _enhance_recommendations_chunk(self, recommendations):
+        try:
+            numbered = "\n".join(
+                f"{i + 1}. {json.dumps(rec, default=str)}" for i, rec in enumerate(recommendations)
+            )
+            prompt = f"""
+            다음 {len(recommendations)}개의 AWS 리소스 추천사항 각각에 대한 상세한 최적화 전략을 제공해주세요:
+            {numbered}
+            
+            각 전략에는 다음 내용을 포함하여 자연스러운 문장으로 작성해주세요:
+    
+            1. 현재 상황 분석과 문제점
+            2. 구체적인 최적화 방안과 기대효과
+            3. 예상되는 비용 절감 효과
+            4. 구현 시 고려사항과 주의점
+            5. AWS 모범 사례 기반의 권장사항
+    
+            기술적인 내용을 포함하되, 이해하기 쉽게 설명해주세요.
+            단계별 나열이나 목록 형태를 피하고, 자연스러운 문단 형태로 작성해주세요.
+            resource id를 필수로 포함해주시고, tags 등 추가 정보가 있으면 함께 활용해주세요.
+            
+            반드시 입력 순서와 동일한 순서로 {len(recommendations)}개의 전략 문자열로 구성된 JSON 배열만 반환해주세요.
+            """
+            response = self.invoke_model(
+                prompt,
+                max_tokens=RECOMMENDATION_TOKENS_PER_ITEM * len(recommendations),
+                temperature=0.7
+            )
+            match = _JSON_ARRAY_RE.search(response) if response else None
+            if match:
+                strategies = orjson.loads(match.group(0))[:len(recommendations)]
+                return strategies + [None] * (len(recommendations) - len(strategies))
+        except Exception as e:
+            print(f"Error enhancing recommendations batch: {str(e)}")
+        return [None] * len(recommendations)
+
+
 # AWS 전문가 채팅
 ## AWS 관련 질문에 대한 전문가 수준의 응답제공
 ## 추가 컨텍스트 정보 활용
 ## 기술적이면서도 이해하기 쉬운 응답 생성
+## 같은 질문과 컨텍스트로 만든 프롬프트는 캐시된 응답을 바로 반환
     
     def chat_with_aws_expert(self, user_question, context=None):
         try:
-            # context가 DataFrame인 경우 dict로 변환
-            if isinstance(context, pd.DataFrame):
-                context = context.to_dict(orient='records')
-            elif isinstance(context, dict):
-                for key, value in context.items():
-                    if isinstance(value, pd.DataFrame):
-                        context[key] = value.to_dict(orient='records')
+            prompt = self._build_expert_prompt(user_question, context)
+            key = self._chat_cache_key(prompt)
+            response = self._chat_cache_get(key)
+            if response is None:
+                response = self.invoke_model(prompt, max_tokens=2000, temperature=0.7)
+                if response:
+                    self._chat_cache_put(key, response)
+            return response
+        except Exception as e:
+            print(f"Error in chat with AWS expert: {str(e)}")
+            return "Unable to process your question at this time."
+
+    # 스트리밍 버전: 응답 텍스트 조각을 생성되는 즉시 반환
+    ## 캐시 적중 시 전체 응답을 한 번에 반환, 스트림이 끝까지 성공한 응답만 캐시에 저장
+    def chat_with_aws_expert_stream(self, user_question, context=None):
+        prompt = self._build_expert_prompt(user_question, context)
+        key = self._chat_cache_key(prompt)
+        cached = self._chat_cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        try:
+            for text in self._iter_stream_text(prompt, max_tokens=2000, temperature=0.7):
+                chunks.append(text)
+                yield text
+        except Exception as e:
+            print(f"Error invoking Bedrock model stream: {str(e)}")
+            return
+        if chunks:
+            self._chat_cache_put(key, ''.join(chunks))
 
-            prompt = f"""
+    @staticmethod
+    def _chat_cache_key(prompt):
+        return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+
+    def _chat_cache_get(self, key):
+        with self._chat_cache_lock:
+            response = self._chat_cache.get(key)
+            if response is not None:
+                self._chat_cache.move_to_end(key)
+            return response
+
+    def _chat_cache_put(self, key, response):
+        with self._chat_cache_lock:
+            self._chat_cache[key] = response
+            self._chat_cache.move_to_end(key)
+            while len(self._chat_cache) > CHAT_CACHE_SIZE:
+                self._chat_cache.popitem(last=False)
+
+    def _build_expert_prompt(self, user_question, context):
+        # context가 DataFrame인 경우에만 dict로 변환 (list/dict는 그대로 사용, 호출자의 dict는 변경하지 않음)
+        if isinstance(context, pd.DataFrame):
+            context = context.to_dict(orient='records')
+        elif isinstance(context, dict) and any(isinstance(value, pd.DataFrame) for value in context.values()):
+            context = {
+                key: value.to_dict(orient='records') if isinstance(value, pd.DataFrame) else value
+                for key, value in context.items()
+            }
+
+        return f"""
             You are an AWS expert. Answer this question about AWS resources:
             Question: {user_question}
             
             Context (if available):
-            {json.dumps(context) if context else 'No additional context provided'}
+            {json.dumps(context, default=str) if context else 'No additional context provided'}
             
             Provide a detailed, technical, yet easy to understand response.
             """
-            return self.invoke_model(prompt, max_tokens=2000, temperature=0.7)
-        except Exception as e:
-            print(f"Error in chat with AWS expert: {str(e)}")
-            return "Unable to process your question at this time."
@@ -1,22 +1,25 @@
 import boto3
-import json
+from botocore.config import Config
+import orjson
 import sys
 
 def chunk_handler(chunk):
     print(chunk, end='')
 
-def get_streaming_response(prompt, model_id, streaming_callback):
-    session = boto3.Session()
-    
-    bedrock = session.client(service_name='bedrock-runtime')
+# client는 한 번만 생성하여 호출마다 재사용
+_BEDROCK = boto3.client(
+    service_name='bedrock-runtime',
+    config=Config(retries={'mode': 'adaptive', 'max_attempts': 10}, max_pool_connections=50)
+)
 
+def get_streaming_response(prompt, model_id, streaming_callback):
     message = {
         "role": "user",
         "content": [{"text": prompt}]
     }
     
     try:
-        response = bedrock.converse_stream(
+        response = _BEDROCK.converse_stream(
             modelId=model_id,
             messages=[message],
             inferenceConfig={
@@ -33,9 +36,9 @@ def get_streaming_response(prompt, model_id, streaming_callback):
 
             if "metadata" in event:
                 print("\n\n---- usage ----")
-                print(json.dumps(event['metadata']['usage'], indent=4))
+                print(orjson.dumps(event['metadata']['usage'], option=orjson.OPT_INDENT_2).decode())
                 print("\n---- metrics ----")
-                print(json.dumps(event['metadata']['metrics'], indent=4))
+                print(orjson.dumps(event['metadata']['metrics'], option=orjson.OPT_INDENT_2).decode())
     except Exception as e:
         print(f"Error occurred: {e}")
 
@@ -1,14 +1,20 @@
 import json
 import boto3
+from botocore.config import Config
 import sys
-from numpy import dot
-from numpy.linalg import norm
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
-def get_embedding(text):
-    session = boto3.Session()
-    bedrock = session.client(service_name='bedrock-runtime')
+# client는 한 번만 생성하여 모든 호출(스레드 포함)에서 재사용, adaptive 재시도로 병렬 호출 시 스로틀링 완화
+_BEDROCK = boto3.client(
+    service_name='bedrock-runtime',
+    config=Config(retries={'mode': 'adaptive', 'max_attempts': 10}, max_pool_connections=50)
+)
 
-    response = bedrock.invoke_model(
+
+def get_embedding(text):
+    response = _BEDROCK.invoke_model(
         body=json.dumps({"inputText": text}),
         modelId="amazon.titan-embed-text-v2:0",
         accept="application/json",
@@ -19,22 +25,50 @@ def get_embedding(text):
     return response_body['embedding']
 
 
-class EmbedItem:
-    def __init__(self, text):
-        self.text = text
-        self.embedding = get_embedding(text)
+# items.txt 임베딩 디스크 캐시 (임베딩 행렬, 행별 norm, 텍스트 목록)
+## 같은 items.txt를 다시 실행하면 Bedrock 호출과 norm 계산 없이 .npy를 mmap으로 바로 로드 (np.load는 .npz에는 mmap_mode를 적용하지 않음)
+## items.txt가 바뀌면 기존 행은 재사용하고 새로 추가된 줄만 임베딩 조회
+def load_item_embeddings(text_items, cache_dir):
+    emb_path = os.path.join(cache_dir, "items_emb.npy")
+    norms_path = os.path.join(cache_dir, "items_norms.npy")
+    texts_path = os.path.join(cache_dir, "items_texts.npy")
+
+    cached_rows = {}
+    if all(os.path.exists(path) for path in (emb_path, norms_path, texts_path)):
+        cached_texts = np.load(texts_path).tolist()
+        cached_emb = np.load(emb_path, mmap_mode='r')
+        if cached_texts == text_items:
+            return cached_emb, np.load(norms_path)
+        cached_rows = {text: cached_emb[i] for i, text in enumerate(cached_texts)}
+
+    # 새로 추가된 줄만 병렬로 조회 (executor.map으로 입력 순서 유지)
+    missing = [text for text in dict.fromkeys(text_items) if text not in cached_rows]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        new_rows = dict(zip(missing, executor.map(get_embedding, missing)))
+
+    emb_matrix = np.asarray(
+        [cached_rows[text] if text in cached_rows else new_rows[text] for text in text_items],
+        dtype=np.float32
+    )
+    emb_norms = np.linalg.norm(emb_matrix, axis=1)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(emb_path, emb_matrix)
+    np.save(norms_path, emb_norms)
+    np.save(texts_path, np.array(text_items))
+    return emb_matrix, emb_norms
 
-class ComparisonResult:
-    def __init__(self, text, similarity):
-        self.text = text
-        self.similarity = similarity
 
+class EmbedItem:
+    def __init__(self, text, embedding=None):
+        self.text = text
+        self.embedding = embedding if embedding is not None else get_embedding(text)
 
-def calculate_similarity(a, b):
-    return dot(a, b) / (norm(a) * norm(b))
 
+# 모든 아이템과의 코사인 유사도를 행렬-벡터 곱 한 번으로 계산
+def calculate_similarities(emb_matrix, emb_norms, query):
+    query = np.asarray(query, dtype=np.float32)
+    return (emb_matrix @ query) / (emb_norms * np.linalg.norm(query))
 
-import os
 
 if __name__ == '__main__':
     
@@ -44,26 +78,16 @@ if __name__ == '__main__':
     with open(items_file, "r") as f:
         text_items = f.read().splitlines()
 
-    items = []
-    for text in text_items:
-        items.append(EmbedItem(text))
-    
-
-test_text = "사과, 바나나, 오렌지"
-
-input_item = EmbedItem(test_text)
-
-print(f"유사도 정렬 : '{input_item.text}'")
-print("----------------")
-cosine_comparisons = []
-
-for item in items:
-    similarity_score = calculate_similarity(input_item.embedding, item.embedding)
+    cache_dir = os.path.join(current_dir, ".embedding_cache")
+    emb_matrix, emb_norms = load_item_embeddings(text_items, cache_dir)
 
-    cosine_comparisons.append(ComparisonResult(item.text, similarity_score))  # save the comparisons to a list
+    test_text = "사과, 바나나, 오렌지"
 
-cosine_comparisons.sort(key=lambda x: x.similarity, reverse=True)  # list the closest matches first
+    input_item = EmbedItem(test_text)
 
-for c in cosine_comparisons:
-    print("%.6f" % c.similarity, "\t", c.text)
+    print(f"유사도 정렬 : '{input_item.text}'")
+    print("----------------")
+    similarities = calculate_similarities(emb_matrix, emb_norms, input_item.embedding)
 
+    for i in np.argsort(-similarities):  # list the closest matches first
+        print("%.6f" % similarities[i], "\t", text_items[i])
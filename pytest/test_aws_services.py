@@ -1,3 +1,4 @@
+import math
 import pytest
 from aws_services import AWSResourceCollector
 
@@ -13,18 +14,26 @@ class DummyCostExplorer:
         return self.response
 
 @pytest.fixture
-def collector():
+def collector(tmp_path):
     coll = AWSResourceCollector()
+    coll.ce_cache_dir = str(tmp_path)  # 테스트 간 Cost Explorer 디스크 캐시 공유 방지
     return coll
 
 def test_get_resource_cost_success(collector):
-    # Simulate a successful response
+    # Simulate a successful response grouped by SERVICE and REGION
     response = {
         "ResultsByTime": [
             {
-                "Total": {
-                    "UnblendedCost": {"Amount": "123.45"}
-                }
+                "Groups": [
+                    {
+                        "Keys": ["Amazon Elastic Compute Cloud - Compute", "us-east-1"],
+                        "Metrics": {"UnblendedCost": {"Amount": "123.45"}}
+                    },
+                    {
+                        "Keys": ["Amazon Elastic Compute Cloud - Compute", "us-west-2"],
+                        "Metrics": {"UnblendedCost": {"Amount": "1.00"}}
+                    }
+                ]
             }
         ]
     }
@@ -41,12 +50,21 @@ def test_get_resource_cost_no_results(collector):
     #print(" no cost: ", cost, flush=True)
     assert cost == 0.0
 
+def test_get_cost_and_usage_disk_cache(collector):
+    # 두 번째 호출은 Cost Explorer 대신 디스크 캐시에서 반환
+    response = { "ResultsByTime": [] }
+    collector.ce = DummyCostExplorer(response=response)
+    params = {"TimePeriod": {"Start": "2024-01-01", "End": "2024-02-01"}, "Granularity": "MONTHLY", "Metrics": ["UnblendedCost"]}
+    assert collector._get_cost_and_usage(**params) == response
+    collector.ce = DummyCostExplorer(raise_exception=True)
+    assert collector._get_cost_and_usage(**params) == response
+
 def test_get_resource_cost_exception(collector):
     # Simulate an exception in the Cost Explorer call
     collector.ce = DummyCostExplorer(raise_exception=True)
     cost = collector.get_resource_cost("i-1234567890abcdef0", "EC2", "us-east-1")
     #print("exception cost: ", cost,  flush=True)
-    assert cost == 0.0
+    assert math.isnan(cost)  # 조회 실패는 0원이 아닌 알 수 없음(NaN)으로 표시
 
 def test_get_resource_cost_integration_ec2(collector):
     # 실제 AWS에 호출하여 실제 cost 값을 반환하는 통합 테스트
@@ -66,4 +84,111 @@ def test_get_resource_cost_integration_rds(collector):
     cost = collector.get_resource_cost(instance_id, service, region)
     print("integration cost: ", cost, flush=True)
     # cost가 숫자인지 확인
-    assert isinstance(cost, float)
\ No newline at end of file
+    assert isinstance(cost, float)
+
+
+# Dummy CloudWatch to simulate paginated GetMetricData responses
+class DummyCloudWatch:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get_metric_data(self, **kwargs):
+        self.calls.append(kwargs)
+        return self.pages[len(self.calls) - 1]
+
+def test_get_cloudwatch_metrics_batch(collector):
+    # m{resource}_{metric} Id 별 결과가 NextToken 페이지에 걸쳐 나뉘어 오는 경우
+    cloudwatch = DummyCloudWatch([
+        {
+            "MetricDataResults": [
+                {"Id": "m0_0", "Values": [10.0]},
+                {"Id": "m1_0", "Values": []}
+            ],
+            "NextToken": "next"
+        },
+        {
+            "MetricDataResults": [
+                {"Id": "m0_0", "Values": [12.345]},
+                {"Id": "m1_2", "Values": [3.0]}
+            ]
+        }
+    ])
+    collector.client_factory = lambda service_name, region_name=None: cloudwatch
+    metrics = collector.get_cloudwatch_metrics_batch(["db-1", "db-2"], "RDS", "us-east-1")
+    assert len(cloudwatch.calls) == 2
+    assert cloudwatch.calls[1]["NextToken"] == "next"
+    assert metrics["db-1"] == {"CPUUtilization": {"value": 12.35, "unit": "Percent"}}
+    assert metrics["db-2"] == {"DatabaseConnections": {"value": 3.0, "unit": "Count"}}
+
+def test_active_regions(collector):
+    # 비용이 발생한 리전만 수집 대상, Cost Explorer 실패 시 전체 리전 사용
+    response = {
+        "ResultsByTime": [
+            {
+                "Groups": [
+                    {"Keys": ["AWS Lambda", "us-east-1"], "Metrics": {"UnblendedCost": {"Amount": "2.50"}}},
+                    {"Keys": ["AWS Lambda", "us-west-2"], "Metrics": {"UnblendedCost": {"Amount": "0"}}}
+                ]
+            }
+        ]
+    }
+    collector.regions = ["us-east-1", "us-west-2", "eu-west-1"]
+    collector.ce = DummyCostExplorer(response=response)
+    assert collector._active_regions() == ["us-east-1"]
+    collector._cost_cache = None
+    collector.ce_cache_dir = collector.ce_cache_dir + "/empty"
+    collector.ce = DummyCostExplorer(raise_exception=True)
+    assert collector._active_regions() == ["us-east-1", "us-west-2", "eu-west-1"]
+
+# Dummy Cost Explorer that also supports resource-level (RESOURCE_ID) cost data
+class DummyResourceCostExplorer(DummyCostExplorer):
+    def __init__(self, response, resource_response):
+        super().__init__(response=response)
+        self.resource_response = resource_response
+
+    def get_cost_and_usage_with_resources(self, **kwargs):
+        return self.resource_response
+
+def test_get_resource_cost_resource_level(collector):
+    # EC2는 RESOURCE_ID 그룹 비용 사용 (사용 내역이 없는 인스턴스는 0원), 다른 서비스는 서비스/리전별 비용으로 대체
+    response = {
+        "ResultsByTime": [
+            {
+                "Groups": [
+                    {"Keys": ["Amazon Elastic Compute Cloud - Compute", "us-east-1"], "Metrics": {"UnblendedCost": {"Amount": "3.00"}}},
+                    {"Keys": ["AWS Lambda", "us-east-1"], "Metrics": {"UnblendedCost": {"Amount": "0.75"}}}
+                ]
+            }
+        ]
+    }
+    resource_response = {
+        "ResultsByTime": [
+            {
+                "Groups": [
+                    {"Keys": ["i-1"], "Metrics": {"UnblendedCost": {"Amount": "5.00"}}}
+                ]
+            }
+        ]
+    }
+    collector.ce = DummyResourceCostExplorer(response, resource_response)
+    assert collector.get_resource_cost("i-1", "EC2", "us-east-1") == 5.0
+    assert collector.get_resource_cost("i-2", "EC2", "us-east-1") == 0.0
+    assert collector.get_resource_cost("fn-1", "Lambda", "us-east-1") == 0.75
+    assert collector.cost_window_days("EC2") == 14
+    assert collector.cost_window_days("Lambda") == 30
+
+def test_predict_costs_flat_trend_is_stable(collector):
+    # 일정한 일별 비용은 polyfit 오차(±1e-16)와 무관하게 stable
+    response = {
+        "ResultsByTime": [
+            {
+                "TimePeriod": {"Start": f"2024-01-{day:02d}"},
+                "Groups": [{"Keys": ["AWS Lambda"], "Metrics": {"UnblendedCost": {"Amount": "3.3"}}}]
+            }
+            for day in range(1, 31)
+        ]
+    }
+    collector.ce = DummyCostExplorer(response=response)
+    predictions = collector.predict_costs()
+    assert predictions["Lambda"]["trend"] == "stable"